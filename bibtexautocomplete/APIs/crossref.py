@@ -5,8 +5,10 @@ Lookup info from https://www.crossref.org
 from typing import Dict, Iterable, List, Optional, Tuple
 
 from ..bibtex.author import Author
-from ..bibtex.constants import FieldNames
+from ..bibtex.constants import ENTRY_NO_MATCH, FieldNames
 from ..bibtex.entry import BibtexEntry
+from ..bibtex.normalize import normalize_doi
+from ..lookups.abstract_entry_lookup import LookupResult
 from ..lookups.lookups import JSON_Lookup
 from ..utils.constants import QUERY_MAX_RESULTS
 from ..utils.safe_json import SafeJSON
@@ -22,6 +24,8 @@ class CrossrefLookup(JSON_Lookup):
     https://api.crossref.org/works/10.1109/tro.2004.829459
     Author + title:
     https://api.crossref.org/works?rows=3&query.title=Reactive+Path+Deformation+for+Nonholonomic+Mobile+Robots&query.author=Lamiraux
+    Batch DOI mode (filters with the same name are OR-ed):
+    https://api.crossref.org/works?rows=2&filter=doi:10.1109/tro.2004.829459,doi:10.1007/3-540-46425-5_21
     """
 
     name = "crossref"
@@ -31,13 +35,63 @@ class CrossrefLookup(JSON_Lookup):
     domain = "api.crossref.org"
     path = "/works"
 
+    batch_size = 20
+    # DOIs to fetch with a single filter query, only set in query_batch
+    batch_dois: Optional[List[str]] = None
+
+    @classmethod
+    def query_batch(cls, entries: List[BibtexEntry]) -> Dict[int, LookupResult]:
+        """Fetch all known DOIs with a single filter query,
+        then dispatch the results to the entries by DOI"""
+        positions: Dict[str, List[int]] = dict()
+        for index, entry in enumerate(entries):
+            doi = entry.doi.to_str()
+            if doi is not None:
+                positions.setdefault(doi, []).append(index)
+        if len(positions) < 2:
+            return dict()  # No gain over the regular DOI query
+
+        lookup = cls(entries[0])
+        lookup.batch_dois = list(positions)
+        data = lookup.get_data()
+        if data is None or data.code not in lookup.ok_codes:
+            return dict()
+        info = lookup.get_last_query_info()
+
+        works: Dict[str, List[SafeJSON]] = dict()
+        for result in lookup.get_results(data.data) or ():
+            doi = normalize_doi(result["DOI"].to_str())
+            if doi in positions:
+                works.setdefault(doi, []).append(result)
+
+        found: Dict[int, LookupResult] = dict()
+        for doi, results in works.items():
+            for index in positions[doi]:
+                entry_lookup = cls(entries[index])
+                max_score = ENTRY_NO_MATCH
+                for result in results:
+                    value = entry_lookup.get_value(result)
+                    score = entry_lookup.match_score(value, result)
+                    if score > max_score:
+                        max_score = score
+                        found[index] = LookupResult(value, {**info, "hit-count": len(results)})
+        return found
+
     def get_path(self) -> str:
         if self.doi is not None:
             return self.path + "/" + self.doi
         return super().get_path()
 
     def get_params(self) -> Dict[str, str]:
-        base = {"rows": str(QUERY_MAX_RESULTS)}
+        # Identified queries (mailto) are served by Crossref's faster polite pool
+        mailto = self.etiquette.email
+        if self.batch_dois is not None:
+            return {
+                "rows": str(len(self.batch_dois)),
+                "filter": ",".join("doi:" + doi for doi in self.batch_dois),
+                "mailto": mailto,
+            }
+        base = {"rows": str(QUERY_MAX_RESULTS), "mailto": mailto}
         if self.title is not None:
             base["query.title"] = self.title
         if self.authors is not None:
@@ -52,7 +52,7 @@ class OpenAlexLookup(JSON_Lookup):
         return self.path
 
     def get_params(self) -> Dict[str, str]:
-        base = dict()
+        base = {"mailto": self.etiquette.email}  # Join OpenAlex's polite pool
         base.update(super().get_params())
         if self.doi is not None:
             return base
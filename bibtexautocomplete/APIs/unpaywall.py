@@ -8,7 +8,6 @@ from ..bibtex.author import Author
 from ..bibtex.constants import FieldNames
 from ..bibtex.entry import BibtexEntry
 from ..lookups.lookups import JSON_Lookup
-from ..utils.constants import EMAIL
 from ..utils.functions import split_iso_date
 from ..utils.safe_json import SafeJSON
 
@@ -36,13 +35,11 @@ class UnpaywallLookup(JSON_Lookup):
     domain = "api.unpaywall.org"
     path = "/v2/"
 
-    params = {"email": EMAIL}
-
     doi: Optional[str] = None
     title: Optional[str] = None
 
     def get_params(self) -> Dict[str, str]:
-        base = dict()
+        base = {"email": self.etiquette.email}
         base.update(super().get_params())
         if self.doi is None:
             if self.title is None:
@@ -1,86 +1,112 @@
 """Lookup info from https://zbmath.org"""
 
 import re
-from typing import Dict, Iterable, Iterator, List, Optional
+from copy import copy
+from io import BytesIO
+from typing import Callable, ClassVar, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from ..bibtex.author import Author
-from ..bibtex.constants import FieldNames
+from ..bibtex.constants import ENTRY_NO_MATCH, FIELD_NO_MATCH, FieldNames
 from ..bibtex.entry import BibtexEntry
 from ..bibtex.normalize import author_search_key, normalize_doi
+from ..lookups.abstract_entry_lookup import LookupResult
 from ..lookups.lookups import JSON_Lookup
 from ..utils.constants import QUERY_MAX_RESULTS
+from ..utils.logger import logger
 from ..utils.safe_json import JSONType, SafeJSON
 
+try:
+    from ijson import JSONError, items
 
-
-LATEX_COMMANDS_TO_REMOVE = {
-    "textbf",
-    "textit",
-    "textsc",
-    "texttt",
-    "textsf",
-    "textnormal",
-    "textrm",
-    "textsl",
-    "textup",
-    "emph",
-    "mathbf",
-    "mathrm",
-    "mathsf",
-    "mathbb",
-    "mathcal",
-    "mathscr",
-    "mathfrak",
-    "mathit",
-    "boldsymbol",
-    "operatorname",
-    "underline",
-    "overline",
-    "widehat",
-    "widetilde",
-    "hat",
-    "tilde",
-    "bar",
-    "vec",
-    "dot",
-    "ddot",
-    "breve",
-    "check",
-    "acute",
-    "grave",
-}
-
+    def iter_documents(data: bytes) -> Iterator[JSONType]:
+        """Stream the documents of a zbMATH response one at a time,
+        so the full result list is never decoded at once"""
+        try:
+            yield from items(BytesIO(data), "result.item", use_float=True)
+        except JSONError as err:
+            logger.debug("zbMATH: invalid JSON response ({err})", err=err)
+
+except ImportError:
+
+    def iter_documents(data: bytes) -> Iterator[JSONType]:
+        """Fallback when the optional ijson dependency is missing:
+        decode the whole response and iterate through its result list"""
+        yield from SafeJSON.from_bytes(data)["result"].to_list() or ()
+
+
+LATEX_COMMANDS_TO_REMOVE = frozenset(
+    {
+        "textbf",
+        "textit",
+        "textsc",
+        "texttt",
+        "textsf",
+        "textnormal",
+        "textrm",
+        "textsl",
+        "textup",
+        "emph",
+        "mathbf",
+        "mathrm",
+        "mathsf",
+        "mathbb",
+        "mathcal",
+        "mathscr",
+        "mathfrak",
+        "mathit",
+        "boldsymbol",
+        "operatorname",
+        "underline",
+        "overline",
+        "widehat",
+        "widetilde",
+        "hat",
+        "tilde",
+        "bar",
+        "vec",
+        "dot",
+        "ddot",
+        "breve",
+        "check",
+        "acute",
+        "grave",
+    }
+)
+
+# Matches a backslash followed by an optional command to remove.
+# Longest commands come first so they win over any shorter prefix.
+LATEX_COMMAND_RE = re.compile(
+    r"\\(?:" + "|".join(sorted(map(re.escape, LATEX_COMMANDS_TO_REMOVE), key=len, reverse=True)) + ")?",
+    re.IGNORECASE,
+)
+BRACE_RE = re.compile(r"[{}]")
 WHITESPACE_RE = re.compile(r"\s+")
 
+# Parts of result documents that ZbMathLookup.get_value only reads when needed
+# (the others are listed in ZbMathLookup._PATHS)
+LINKS_PATH = SafeJSON.path(("links",))
+BOOK_PATH = SafeJSON.path(("source", "book", 0))
+
 
 def strip_latex_code(text: str) -> str:
-    """Return *text* with LaTeX commands and math delimiters removed.
+    r"""Return *text* with LaTeX commands and math delimiters removed.
 
     This is a best-effort cleanup that strips common command markers (``\``)
     and inline math delimiters (``$``). It intentionally keeps the remaining
     content untouched so that meaningful characters such as letters or numbers
     remain available for searches.
     """
-
-    without_math = text.replace("$", " ")
-    parts = without_math.split("\\")
-    if len(parts) == 1:
-        cleaned = without_math
-    else:
-        cleaned_parts: List[str] = [parts[0]]
-        for segment in parts[1:]:
-            lower = segment.lower()
-            stripped = segment
-            for command in LATEX_COMMANDS_TO_REMOVE:
-                if lower.startswith(command):
-                    stripped = segment[len(command) :]
-                    break
-            cleaned_parts.append(stripped)
-        cleaned = "".join(cleaned_parts)
-    cleaned = cleaned.replace("{", "").replace("}", "")
+    cleaned = LATEX_COMMAND_RE.sub("", text.replace("$", " "))
+    cleaned = BRACE_RE.sub("", cleaned)
     return WHITESPACE_RE.sub(" ", cleaned).strip()
 
 
+def title_search(title: str, authors: Iterable[str]) -> str:
+    """zbMATH search_string for a title and authors
+    Quotes the title to mimic the website's exact phrase search behaviour"""
+    return " ".join((f'"{title}"', *authors))
+
+
 class ZbMathLookup(JSON_Lookup):
     """Lookup for info on https://zbmath.org
     Uses the zbMATH Open API documented here:
@@ -91,6 +117,8 @@ class ZbMathLookup(JSON_Lookup):
     https://api.zbmath.org/v1/document/_search?search_string=doi:10.1007/3-540-46425-5_21&format=json
     Title + author:
     https://api.zbmath.org/v1/document/_search?search_string=Lamiraux&format=json
+    Batch mode (OR-ed searches, see query_batch):
+    https://api.zbmath.org/v1/document/_search?search_string=doi:10.1007/xyz | ("Title" Lamiraux)&format=json
     """
 
     name = "zbmath"
@@ -103,29 +131,67 @@ class ZbMathLookup(JSON_Lookup):
     # zbMATH requires agreement to their terms via a cookie
     headers = {"Cookie": "tsnc=agreed"}
 
+    # Parameters common to all queries
+    _base_params: ClassVar[Dict[str, str]] = {
+        "format": "json",
+        "results_per_page": str(QUERY_MAX_RESULTS),
+    }
+
+    # DOIs for which zbMATH returned no results, shared by all lookups
+    # so that duplicated DOIs are only searched once
+    _bad_doi_cache: ClassVar[Set[str]] = set()
+
+    batch_size = 10
+    # Maximum length of a batched search_string, to avoid overly long URLs (HTTP 414)
+    batch_max_length = 1500
+    # zbMATH doesn't return more than this number of results per page
+    max_results_per_page = 100
+
+    __slots__ = (
+        "_use_latex_stripped_title",
+        "_latex_retry_attempted",
+        "_latex_stripped_title",
+        "_latex_retry",
+        "_cached_title",
+        "_cached_doi",
+        "_cached_author_keys",
+        "_result_count",
+        "_batch_search",
+    )
+
     def __init__(self, entry: BibtexEntry) -> None:
         super().__init__(entry)
+        self._result_count = -1  # Number of results of the last query, -1 if none made
+        self._batch_search: Optional[str] = None  # search_string of a batched query
         self._use_latex_stripped_title = False
         self._latex_retry_attempted = False
         self._latex_stripped_title: Optional[str] = None
+        self._latex_retry: Optional["ZbMathLookup"] = None
+        # Read the entry once, these are reused by the LaTeX retry
+        self._cached_title = entry.title.to_str()
+        self._cached_doi = normalize_doi(entry.doi.to_str())
+        authors = entry.author.value
+        self._cached_author_keys: Optional[Tuple[str, ...]] = None
+        if authors is not None:
+            self._cached_author_keys = tuple(author_search_key(author) for author in authors)
 
     def _get_query_title(self) -> Optional[str]:
         if self._use_latex_stripped_title:
             return self._latex_stripped_title
-        return self.entry.title.to_str()
+        return self._cached_title
 
     def iter_queries(self) -> Iterator[None]:
         """Perform DOI, title+author and title searches without normalizing"""
         self.title = self._get_query_title()
-        self.doi = self.entry.doi.to_str()
-        if self._use_latex_stripped_title:
-            self.doi = None
-        authors = self.entry.author.value
-        if authors is not None:
-            self.authors = [author_search_key(author) for author in authors]
+        self.doi = None if self._use_latex_stripped_title else self._cached_doi
+        if self._cached_author_keys is not None:
+            self.authors = list(self._cached_author_keys)
 
         if self.query_doi and self.doi is not None:
-            yield None
+            if self.doi not in self._bad_doi_cache:
+                yield None
+                if self._last_query_info.get("response-status") == 200 and self._last_result_count == 0:
+                    self._bad_doi_cache.add(self.doi)
             self.doi = None
 
         if self.title is None:
@@ -138,34 +204,105 @@ class ZbMathLookup(JSON_Lookup):
         if self.query_title:
             yield None
 
-
     def get_params(self) -> Dict[str, str]:
-        params: Dict[str, str] = {
-            "format": "json",
-            "results_per_page": str(QUERY_MAX_RESULTS),
-        }
+        if self._batch_search is not None:
+            return {
+                **self._base_params,
+                "results_per_page": str(self.max_results_per_page),
+                "search_string": self._batch_search,
+            }
         if self.doi is not None:
-            params["search_string"] = f"doi:{self.doi}"
-            return params
+            return {**self._base_params, "search_string": f"doi:{self.doi}"}
         if self.title is None:
             raise ValueError("zbMATH called with no title")
 
-        # Quote the title to mimic the website's exact phrase search behaviour
-        search = f'"{self.title}"'
-        if self.authors:
-            search += " " + " ".join(self.authors)
-        params["search_string"] = search
-        return params
+        return {**self._base_params, "search_string": title_search(self.title, self.authors or ())}
+
+    def batch_search(self) -> Optional[str]:
+        """Search for this entry in a batched query: its DOI if known,
+        else its title and authors. None if it can't be batched"""
+        if self.query_doi and self._cached_doi is not None and self._cached_doi not in self._bad_doi_cache:
+            return f"doi:{self._cached_doi}"
+        title = self._cached_title
+        if not self.query_author_title or title is None or self._cached_author_keys is None or '"' in title:
+            return None
+        return "(" + title_search(title, self._cached_author_keys) + ")"
+
+    @classmethod
+    def query_batch(cls, entries: List[BibtexEntry]) -> Dict[int, LookupResult]:
+        """OR-combine the searches of multiple entries into a single query,
+        then dispatch the results to the entries they match"""
+        lookups = [cls(entry) for entry in entries]
+        searches = [(index, lookup.batch_search()) for index, lookup in enumerate(lookups)]
+        found: Dict[int, LookupResult] = dict()
+        chunk: List[Tuple[int, str]] = []
+        length = 0
+        for index, search in searches:
+            if search is None:
+                continue
+            if chunk and length + len(search) > cls.batch_max_length:
+                found.update(cls._query_chunk(lookups, chunk))
+                chunk, length = [], 0
+            chunk.append((index, search))
+            length += len(search) + 3
+        found.update(cls._query_chunk(lookups, chunk))
+        return found
+
+    @classmethod
+    def _query_chunk(cls, lookups: List["ZbMathLookup"], chunk: List[Tuple[int, str]]) -> Dict[int, LookupResult]:
+        """Perform a single query for all searches in the chunk"""
+        if len(chunk) < 2:
+            return dict()  # No gain over the regular queries
+        lookup = lookups[chunk[0][0]]
+        lookup._batch_search = " | ".join(search for _, search in chunk)
+        try:
+            data = lookup.get_data()
+        finally:
+            lookup._batch_search = None
+        if data is None or data.code not in lookup.ok_codes:
+            return dict()
+        documents = [SafeJSON(document) for document in iter_documents(data.data)]
+        info = lookup.get_last_query_info()
+
+        found: Dict[int, LookupResult] = dict()
+        for index, search in chunk:
+            entry_lookup = lookups[index]
+            entry_lookup.doi = None  # Don't fill in the entry's DOI on results lacking one
+            doi = entry_lookup._cached_doi if search.startswith("doi:") else None
+            max_score = ENTRY_NO_MATCH
+            best: Optional[BibtexEntry] = None
+            # Documents its own search would have found: same DOI, or matching title
+            hits = 0
+            for document in documents:
+                value = entry_lookup.get_value(document)
+                if doi is not None and normalize_doi(value.doi.to_str()) != doi:
+                    continue
+                title_match = entry_lookup.entry.title.matches(value.title)
+                if doi is not None or (title_match is not None and title_match > FIELD_NO_MATCH):
+                    hits += 1
+                score = entry_lookup.match_score(value, document)
+                if score > max_score:
+                    max_score = score
+                    best = value
+            if best is not None:
+                found[index] = LookupResult(best, {**info, "hit-count": hits, "zbmath-result-count": hits})
+            elif doi is not None and 0 < len(documents) < cls.max_results_per_page:
+                # Not truncated and the combined search worked, so the DOI is unknown
+                cls._bad_doi_cache.add(doi)
+        return found
 
     # ============= Parsing results into entries =====================
 
     def get_results(self, data: bytes) -> Optional[Iterable[SafeJSON]]:
         """Return the result list and track the count"""
-        json = SafeJSON.from_bytes(data)
-        results = list(json["result"].iter_list())
-        self._result_count = len(results)
-        return results
+        self._result_count = 0
+        return self._iter_results(data)
 
+    def _iter_results(self, data: bytes) -> Iterator[SafeJSON]:
+        """Lazily wrap documents, counting them as they are consumed"""
+        for document in iter_documents(data):
+            self._result_count += 1
+            yield SafeJSON(document)
 
     @staticmethod
     def get_authors(authors: SafeJSON) -> List[Author]:
@@ -180,14 +317,30 @@ class ZbMathLookup(JSON_Lookup):
                 formatted.append(aut)
         return formatted
 
+    # Values read from every result document, see get_value
+    _PATHS: ClassVar[Dict[str, Callable[[SafeJSON], SafeJSON]]] = {
+        name: SafeJSON.path(keys)
+        for name, keys in {
+            "authors": ("contributors", "authors"),
+            "doi": ("doi",),
+            "document_type": ("document_type", "code"),
+            "series": ("source", "series", 0),
+            "pages": ("source", "pages"),
+            "title": ("title", "title"),
+            "url": ("zbmath_url",),
+            "year": ("year",),
+        }.items()
+    }
+
     def get_value(self, result: SafeJSON) -> BibtexEntry:
         """Extract bibtex data from JSON output"""
+        fields = {name: get(result) for name, get in self._PATHS.items()}
         values = BibtexEntry(self.name, self.entry.id)
-        values.author.set(self.get_authors(result["contributors"]["authors"]))
+        values.author.set(self.get_authors(fields["authors"]))
 
-        doi = normalize_doi(result["doi"].to_str())
+        doi = normalize_doi(fields["doi"].to_str())
         if doi is None:
-            for link in result["links"].iter_list():
+            for link in LINKS_PATH(result).iter_list():
                 if link["type"].to_str() == "doi":
                     doi = normalize_doi(link["identifier"].to_str())
                     if doi is not None:
@@ -196,12 +349,8 @@ class ZbMathLookup(JSON_Lookup):
             doi = normalize_doi(self.doi)
         values.doi.set(doi)
 
-        source = result["source"]
-        doc_type = result["document_type"]["code"].to_str()
-        book = next(source["book"].iter_list(), None)
-        series = next(source["series"].iter_list(), None)
-
-        if doc_type == "j" and series is not None:
+        series = fields["series"]
+        if fields["document_type"].to_str() == "j" and series.value is not None:
             journal_title = series["short_title"].to_str()
             if journal_title is None:
                 journal_title = series["title"].to_str()
@@ -215,32 +364,35 @@ class ZbMathLookup(JSON_Lookup):
                     break
             values.publisher.set(series["publisher"].to_str())
         else:
-            if book is not None:
+            book = BOOK_PATH(result)
+            if book.value is not None:
                 values.publisher.set(book["publisher"].to_str())
                 for isbn in book["isbn"].iter_list():
                     num = isbn["number"].to_str()
                     if num is not None:
                         values.isbn.set(num)
                         break
-            if series is not None:
+            if series.value is not None:
                 values.series.set(series["title"].to_str())
                 if values.publisher.to_str() is None:
                     values.publisher.set(series["publisher"].to_str())
 
-        values.pages.set_str(source["pages"].to_str())
-        values.title.set(result["title"]["title"].to_str())
-        values.url.set(result["zbmath_url"].to_str())
-        values.year.set(result["year"].to_str())
+        values.pages.set_str(fields["pages"].to_str())
+        values.title.set(fields["title"].to_str())
+        values.url.set(fields["url"].to_str())
+        values.year.set(fields["year"].to_str())
         return values
 
     def get_last_query_info(self) -> Dict[str, JSONType]:
+        if self._latex_retry is not None:
+            return self._latex_retry.get_last_query_info()
         info = super().get_last_query_info()
-        if hasattr(self, "_result_count"):
+        if self._result_count >= 0:
             info["zbmath-result-count"] = self._result_count
         return info
 
     def _title_without_latex(self) -> Optional[str]:
-        title = self.entry.title.to_str()
+        title = self._cached_title
         if title is None:
             return None
         stripped = strip_latex_code(title)
@@ -248,7 +400,17 @@ class ZbMathLookup(JSON_Lookup):
             return None
         return stripped
 
+    def _latex_retry_lookup(self, stripped_title: str) -> "ZbMathLookup":
+        """A copy of this lookup searching for the LaTeX stripped title
+        The copy shares the cached entry data, so needs no further setup"""
+        retry = copy(self)
+        retry._use_latex_stripped_title = True
+        retry._latex_stripped_title = stripped_title
+        retry._latex_retry_attempted = True
+        return retry
+
     def query(self) -> Optional[BibtexEntry]:
+        self._latex_retry = None
         result = super().query()
         if result is not None or self._latex_retry_attempted:
             return result
@@ -257,7 +419,7 @@ class ZbMathLookup(JSON_Lookup):
         status = info.get("response-status")
         if not (isinstance(status, int) and 200 <= status < 300):
             return None
-        if getattr(self, "_last_result_count", 0) != 0:
+        if self._last_result_count != 0:
             return None
 
         stripped_title = self._title_without_latex()
@@ -265,14 +427,8 @@ class ZbMathLookup(JSON_Lookup):
             return None
 
         self._latex_retry_attempted = True
-        self._use_latex_stripped_title = True
-        self._latex_stripped_title = stripped_title
-        try:
-            return super().query()
-        finally:
-            self._use_latex_stripped_title = False
-            self._latex_stripped_title = None
-
+        self._latex_retry = self._latex_retry_lookup(stripped_title)
+        return self._latex_retry.query()
 
     # Set of fields we can get from a query.
     # If all are already present on an entry, the query can be skipped.
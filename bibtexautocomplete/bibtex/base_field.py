@@ -8,6 +8,7 @@ from typing import (
     List,
     Optional,
     Protocol,
+    Set,
     Tuple,
     Type,
     TypeVar,
@@ -204,20 +205,20 @@ def matrix_max(matrix: List[List[int]]) -> Optional[Tuple[int, int]]:
 
 
 def iterate_max(matrix: List[List[int]]) -> Iterator[Tuple[int, int]]:
-    """Returns the coordinates x,y of the matrix maximum
-    Modifies the matrix in-place: previously seen rows and columns are
-    no longer valid"""
-    max_pos = matrix_max(matrix)
-    while max_pos is not None:
-        max_x, max_y = max_pos
-        if matrix[max_x][max_y] <= FIELD_NO_MATCH:
-            break
-        yield max_pos
-        matrix[max_x] = [FIELD_NO_MATCH]
-        for row in matrix:
-            if len(row) > max_y:
-                row[max_y] = FIELD_NO_MATCH
-        max_pos = matrix_max(matrix)
+    """Returns the coordinates x,y of the successive matrix maxima,
+    ignoring the rows and columns of previous maxima, while they are above FIELD_NO_MATCH.
+    Ties are broken in row-major order, like matrix_max.
+    Sorts the cells once, instead of rescanning the matrix for each maximum"""
+    cells = sorted(
+        (-value, x, y) for x, row in enumerate(matrix) for y, value in enumerate(row) if value > FIELD_NO_MATCH
+    )
+    seen_x: Set[int] = set()
+    seen_y: Set[int] = set()
+    for _, x, y in cells:
+        if x not in seen_x and y not in seen_y:
+            seen_x.add(x)
+            seen_y.add(y)
+            yield x, y
 
 
 LONG_LIST_DELIMITER = 5_000
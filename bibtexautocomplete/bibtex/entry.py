@@ -3,12 +3,13 @@ Wraps around bibtexparser's entry representations for safer access
 and field normalization
 """
 
-from typing import Any, Dict, NamedTuple, Set, cast
+from typing import TYPE_CHECKING, Any, Dict, NamedTuple, Set, Tuple, Type
 
 from ..utils.constants import EntryType
 from .base_field import BibtexField
 from .constants import (
     ENTRY_NO_MATCH,
+    FIELD_FULL_MATCH,
     FIELD_MULTIPLIERS,
     FIELD_NO_MATCH,
     FieldNamesSet,
@@ -28,6 +29,46 @@ from .fields import (
     YearField,
 )
 
+# Class of each field, fields are only created on first access (see BibtexEntry.get_field)
+FIELD_CLASSES: Dict[FieldType, Type[BibtexField[Any]]] = {
+    "address": BasicStringField,
+    "annote": BasicStringField,
+    "author": NameField,
+    "booktitle": AbbreviatedStringField,
+    "chapter": BasicStringField,
+    "doi": DOIField,
+    "edition": BasicStringField,
+    "editor": NameField,
+    "howpublished": BasicStringField,
+    "institution": AbbreviatedStringField,
+    "issn": ISSNField,
+    "isbn": ISBNField,
+    "journal": AbbreviatedStringField,
+    "month": MonthField,
+    "note": BasicStringField,
+    "number": BasicStringField,
+    "organization": AbbreviatedStringField,
+    "pages": PagesField,
+    "publisher": AbbreviatedStringField,
+    "school": AbbreviatedStringField,
+    "series": AbbreviatedStringField,
+    "title": BasicStringField,
+    "type": BasicStringField,
+    "url": URLField,
+    "volume": BasicStringField,
+    "year": YearField,
+}
+
+# Fields compared after title, doi and author in BibtexEntry.matches,
+# with their score multiplier and whether a mismatch is critical
+OTHER_MATCHED_FIELDS: Tuple[Tuple[FieldType, int, bool], ...] = tuple(
+    (field, *FIELD_MULTIPLIERS.get(field, (1, False))) for field in sorted(FieldNamesSet - {"title", "doi", "author"})
+)
+
+# Highest score returned by BibtexEntry.matches, when all fields fully match
+# Also returned for identical DOIs, so they always win over other results
+ENTRY_MAX_MATCH = FIELD_FULL_MATCH * sum(FIELD_MULTIPLIERS.get(field, (1, False))[0] for field in FieldNamesSet)
+
 
 class FieldSets(NamedTuple):
     """A struct to represent which fields are required/optional/non-standard
@@ -174,41 +215,38 @@ class BibtexEntry:
     year: YearField  # BibtexField[str]
 
     id: str
+    source: str
+    _fields: Dict[FieldType, BibtexField[Any]]  # Fields accessed so far
+
+    __slots__ = ("id", "source", "_fields")
 
     def __init__(self, source: str, entry_id: str):
         """Create a new empty entry,
         source identifies the data's provenance (i.e. lookup name, bibtex file...)
         entry_id is the identifier used to for the entry (@article{entry_id, ...})"""
         self.id = entry_id
-        self.address = BasicStringField(entry_id, "address", source)
-        self.annote = BasicStringField(entry_id, "annote", source)
-        self.author = NameField(entry_id, "author", source)
-        self.booktitle = AbbreviatedStringField(entry_id, "booktitle", source)
-        self.chapter = BasicStringField(entry_id, "chapter", source)
-        self.doi = DOIField(entry_id, "doi", source)
-        self.edition = BasicStringField(entry_id, "edition", source)
-        self.editor = NameField(entry_id, "editor", source)
-        self.howpublished = BasicStringField(entry_id, "howpublished", source)
-        self.institution = AbbreviatedStringField(entry_id, "institution", source)
-        self.issn = ISSNField(entry_id, "issn", source)
-        self.isbn = ISBNField(entry_id, "isbn", source)
-        self.journal = AbbreviatedStringField(entry_id, "journal", source)
-        self.month = MonthField(entry_id, "month", source)
-        self.note = BasicStringField(entry_id, "note", source)
-        self.number = BasicStringField(entry_id, "number", source)
-        self.organization = AbbreviatedStringField(entry_id, "organization", source)
-        self.pages = PagesField(entry_id, "pages", source)
-        self.publisher = AbbreviatedStringField(entry_id, "publisher", source)
-        self.school = AbbreviatedStringField(entry_id, "school", source)
-        self.series = AbbreviatedStringField(entry_id, "series", source)
-        self.title = BasicStringField(entry_id, "title", source)
-        self.type = BasicStringField(entry_id, "type", source)
-        self.url = URLField(entry_id, "url", source)
-        self.volume = BasicStringField(entry_id, "volume", source)
-        self.year = YearField(entry_id, "year", source)
+        self.source = source
+        self._fields = dict()
 
     def get_field(self, field: FieldType) -> BibtexField[Any]:
-        return cast(BibtexField[Any], self.__getattribute__(field))
+        """Return the given field, creating it (empty) on first access
+        Input entries are read by all lookup threads at once: if several create
+        the same field, setdefault (atomic on a dict with str keys) ensures they
+        all get the one that is stored"""
+        value = self._fields.get(field)
+        if value is None:
+            value = self._fields.setdefault(field, FIELD_CLASSES[field](self.id, field, self.source))
+        return value
+
+    if not TYPE_CHECKING:
+        # Hidden from type checkers, so that fields keep the types declared above
+        # and other attributes are still reported as errors
+
+        def __getattr__(self, name: str) -> Any:
+            """Only called for missing attributes, i.e. fields not accessed yet"""
+            if name in FIELD_CLASSES:
+                return self.get_field(name)
+            raise AttributeError(f"'BibtexEntry' object has no attribute '{name}'")
 
     @staticmethod
     def from_entry(source: str, entry: EntryType) -> "BibtexEntry":
@@ -225,15 +263,24 @@ class BibtexEntry:
         """Computes a match score with the other entry
         A score of ENTRY_NO_MATCH indicates a mismatch
         Higher scores indicate more likely match"""
+        # Same DOI, same work: no need to compare the other fields.
+        # DOIs are normalized when set, so comparing the strings is enough.
+        # Different DOIs are still scored, as preprints and their published
+        # version have distinct DOIs
+        doi = self._fields.get("doi")
+        other_doi = other._fields.get("doi")
+        if doi is not None and other_doi is not None and doi.value is not None and doi.value == other_doi.value:
+            return ENTRY_MAX_MATCH
         total = ENTRY_NO_MATCH
         # Match title
         title_match = self.get_field("title").matches(other.get_field("title"))
         if title_match is not None:
             total += FIELD_MULTIPLIERS["title"][0] * title_match
         # Match DOI
-        doi_match = self.get_field("doi").matches(other.get_field("doi"))
-        if doi_match is not None:
-            total += FIELD_MULTIPLIERS["doi"][0] * doi_match
+        if doi is not None and other_doi is not None:
+            doi_match = doi.matches(other_doi)
+            if doi_match is not None:
+                total += FIELD_MULTIPLIERS["doi"][0] * doi_match
         # Match authors before deciding on early exit so author agreement
         # can compensate for partial title mismatches
         author_field = self.get_field("author")
@@ -248,26 +295,29 @@ class BibtexEntry:
         if total <= ENTRY_NO_MATCH:
             return ENTRY_NO_MATCH
         # match all other fields
-        for field in FieldNamesSet - {"title", "doi", "author"}:
-            score = self.get_field(field).matches(other.get_field(field))
+        for field, mult, critical in OTHER_MATCHED_FIELDS:
+            # Fields never accessed are empty, and would not match anyway
+            mine = self._fields.get(field)
+            theirs = other._fields.get(field)
+            if mine is None or theirs is None:
+                continue
+            score = mine.matches(theirs)
             if score is not None:
-                if field in FIELD_MULTIPLIERS:
-                    mult, critical = FIELD_MULTIPLIERS[field]
-                    if score <= FIELD_NO_MATCH and critical:
-                        return ENTRY_NO_MATCH
-                    score *= mult
-                total += score
+                if score <= FIELD_NO_MATCH and critical:
+                    return ENTRY_NO_MATCH
+                total += score * mult
         return total
 
     def __contains__(self, field: FieldType) -> bool:
         """Check if the given field has a value"""
-        return self.get_field(field).value is not None
+        value = self._fields.get(field)
+        return value is not None and value.value is not None
 
     def __str__(self) -> str:
         fields: Dict[FieldType, str] = dict()
         for field in FieldNamesSet:
-            fd = self.get_field(field)
-            if fd.value is not None:
+            fd = self._fields.get(field)
+            if fd is not None and fd.value is not None:
                 fields[field] = fd.value
         return f"Entry{fields}"
 
@@ -0,0 +1,184 @@
+"""
+Fast parser for the common subset of bibtex found in most files:
+entries delimited by braces, whose values are braced, quoted, integers
+or predefined month strings, separated by comments.
+
+It produces the same database as bibtexparser's pyparsing grammar in a single
+linear scan. Anything outside that subset (@string, @preamble, @comment,
+# concatenation, parenthesis delimiters, syntax errors...) makes parse
+return None, in which case bibtexparser should be used instead.
+"""
+
+from re import IGNORECASE, compile
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from bibtexparser.bibdatabase import BibDatabase
+
+from ..utils.constants import EntryType
+
+# pyparsing's default whitespace, skipped between all tokens
+SPACES = compile(r"[ \t\n\r]*")
+
+ENTRY_START = compile(r"@[ \t\n\r]*([A-Za-z]+)[ \t\n\r]*\{[ \t\n\r]*([^\s,{}\"#%@\\]+)[ \t\n\r]*,")
+FIELD_NAME = compile(r"[ \t\n\r]*([A-Za-z0-9_\-().+]+)[ \t\n\r]*=[ \t\n\r]*")
+INTEGER = compile(r"[0-9]+")
+STRING_NAME = compile(r"[A-Za-z0-9_\-:]+")
+BRACES = compile(r"[{}]")
+QUOTE_OR_BRACES = compile(r'["{}]')
+
+# Implicit comments (text between entries) end before a line starting with @
+COMMENT_END = compile(r"[ \t\r]*\n[ \t\n\r]*@")
+# Explicit comments, as written by bibtexparser
+COMMENT_START = compile(r"@comment(?![A-Za-z0-9_$])", IGNORECASE)
+# Entries without fields aren't valid, bibtexparser reads them as comments
+EMPTY_ENTRY = compile(r"@[ \t\n\r]*([A-Za-z]+)[ \t\n\r]*\{[ \t\n\r]*[^\s,{}\"#%@\\]+[ \t\n\r]*,[ \t\n\r]*\}")
+
+# Entry types that have special meaning for bibtexparser
+SPECIAL_TYPES = {"comment", "preamble", "string"}
+
+
+class UnsupportedBibtex(Exception):
+    """Raised when the input is outside of the subset handled by this parser"""
+
+
+def strip_after_new_lines(value: str) -> str:
+    """Removes leading whitespace on all but the first line, as bibtexparser does"""
+    lines = value.splitlines()
+    if len(lines) > 1:
+        lines = [lines[0]] + [line.lstrip() for line in lines[1:]]
+    return "\n".join(lines)
+
+
+def skip_spaces(text: str, pos: int) -> int:
+    """Returns the position of the first non whitespace character after pos"""
+    match = SPACES.match(text, pos)
+    return pos if match is None else match.end()
+
+
+def skip_value(text: str, start: int, closing: str) -> int:
+    """Returns the position after the first closing character (quote or brace)
+    not enclosed in braces, starting from start"""
+    depth = 0
+    for match in (BRACES if closing == "}" else QUOTE_OR_BRACES).finditer(text, start):
+        char = match.group()
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth < 0:
+                if closing == "}":
+                    return match.end()
+                raise UnsupportedBibtex("unbalanced braces")
+        elif depth == 0:
+            return match.end()
+    raise UnsupportedBibtex("unterminated value")
+
+
+def read_value(text: str, pos: int, strings: Dict[str, str]) -> Tuple[str, int]:
+    """Reads the value starting at pos, returns it and the position after it"""
+    char = text[pos : pos + 1]
+    if char == "{" or char == '"':
+        end = skip_value(text, pos + 1, "}" if char == "{" else '"')
+        value = strip_after_new_lines(text[pos + 1 : end - 1])
+        return ("" if value == "{}" else value), end
+    match = INTEGER.match(text, pos)
+    if match is not None:
+        return match.group(), match.end()
+    match = STRING_NAME.match(text, pos)
+    if match is not None and match.group().lower() in strings:
+        return strings[match.group().lower()], match.end()
+    raise UnsupportedBibtex("unsupported value")
+
+
+def read_entry(text: str, pos: int, strings: Dict[str, str]) -> Tuple[EntryType, int]:
+    """Reads the entry starting at pos, returns it and the position after it"""
+    match = ENTRY_START.match(text, pos)
+    if match is None:
+        raise UnsupportedBibtex("unsupported entry")
+    entry_type = match.group(1).lower()
+    if entry_type in SPECIAL_TYPES:
+        raise UnsupportedBibtex("special entry")
+    pos = match.end()
+    fields: List[Tuple[str, str]] = []
+    while True:
+        field = FIELD_NAME.match(text, pos)
+        if field is None:
+            if not fields or text[pos : pos + 1] != "}":
+                raise UnsupportedBibtex("invalid field")
+            pos += 1
+            break
+        value, pos = read_value(text, field.end(), strings)
+        fields.append((field.group(1), value))
+        pos = skip_spaces(text, pos)
+        char = text[pos : pos + 1]
+        if char == "}":
+            pos += 1
+            break
+        if char != ",":
+            raise UnsupportedBibtex("expected ',' or '}'")
+        pos = skip_spaces(text, pos + 1)
+    # Same field order and duplicate handling as bibtexparser
+    by_name = {name: value for name, value in reversed(fields)}
+    entry: EntryType = dict()
+    for name, value in by_name.items():
+        entry[name.lower()] = value
+    entry["ENTRYTYPE"] = entry_type
+    entry["ID"] = match.group(2)
+    return entry, pos
+
+
+def comment_end(text: str, pos: int) -> int:
+    """Returns the position where the comment starting at pos ends"""
+    match = COMMENT_END.search(text, pos)
+    return match.start() if match is not None else max(pos, len(text.rstrip(" \t\n\r")))
+
+
+def is_empty_entry(text: str, pos: int) -> bool:
+    """Checks if the text at pos is an entry with no fields"""
+    match = EMPTY_ENTRY.match(text, pos)
+    return match is not None and match.group(1).lower() not in SPECIAL_TYPES
+
+
+def iter_items(bibtex: str, strings: Dict[str, str]) -> Iterator[Union[EntryType, str]]:
+    """Lazily parses the bibtex string, yielding entries (as dicts)
+    and comments (as str) in file order
+    Raises UnsupportedBibtex when reaching something outside the supported subset"""
+    if bibtex.startswith("\ufeff"):
+        bibtex = bibtex[1:]
+    text = bibtex.expandtabs()  # pyparsing does this too
+    pos = skip_spaces(text, 0)
+    length = len(text)
+    while pos < length:
+        comment = COMMENT_START.match(text, pos)
+        if comment is not None:
+            pos = skip_spaces(text, comment.end())
+            end = comment_end(text, pos)
+            value = text[pos:end].rstrip("\n")
+            # Remove the surrounding braces
+            start = 1 if value[:1] == "{" else 0
+            yield value[start : -1 if value[-1:] == "}" else None]
+            pos = end
+        elif text[pos] == "@" and not is_empty_entry(text, pos):
+            entry, pos = read_entry(text, pos, strings)
+            yield entry
+        else:
+            end = comment_end(text, pos)
+            yield text[pos:end].rstrip("\n")
+            pos = end
+        pos = skip_spaces(text, pos)
+
+
+def parse(bibtex: str) -> Optional[BibDatabase]:
+    """Parses the bibtex string into a database, like bibtexparser would
+    Returns None if it uses features outside the supported subset"""
+    database = BibDatabase()
+    database.load_common_strings()
+    try:
+        for item in iter_items(bibtex, database.strings):
+            if isinstance(item, str):
+                database.comments.append(item)
+            else:
+                database.entries.append(item)
+    except UnsupportedBibtex:
+        return None
+    return database
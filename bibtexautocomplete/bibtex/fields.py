@@ -1,6 +1,7 @@
 from datetime import date
-from re import match, search
-from typing import Dict, Optional, Union
+from functools import lru_cache
+from re import compile, match, search
+from typing import Dict, Optional, Pattern, Union
 
 from ..APIs.doi import DOICheck, URLCheck
 from ..utils.logger import logger
@@ -10,6 +11,16 @@ from .constants import FIELD_FULL_MATCH, FIELD_NO_MATCH
 from .normalize import normalize_str, normalize_str_weak, normalize_url
 
 
+@lru_cache(maxsize=1024)
+def abbrev_pattern(abbrev: str) -> Pattern[str]:
+    """Compiled regex matching the texts abbrev is an abbreviation of, see is_abbrev"""
+    # Algorithm from https://stackoverflow.com/a/7332054
+    return compile("^" + r".*\s".join(r"(|.*\s)".join(word) for word in abbrev.split()))
+
+
+# Authors and journal names are compared against the results of every lookup,
+# so the same pairs are checked repeatedly
+@lru_cache(maxsize=4096)
 def is_abbrev(abbrev: str, text: str) -> bool:
     """Checks if abbrev is an abbreviation of text
     - both must be lowercase with no punctuation
@@ -21,9 +32,7 @@ def is_abbrev(abbrev: str, text: str) -> bool:
       >>> is_abbrev("kph", "Kopenhaven")
       False
     """
-    # Algorithm from https://stackoverflow.com/a/7332054
-    pattern = r".*\s".join(r"(|.*\s)".join(word) for word in abbrev.split())
-    return match("^" + pattern, text) is not None
+    return abbrev_pattern(abbrev).match(text) is not None
 
 
 def pick_longest(a: str, b: str) -> str:
@@ -2,17 +2,27 @@
 Wraps around bibtexparser to provider parser/writer primitives
 """
 
-from typing import Dict, List, Optional, cast
+from threading import Lock
+from typing import IO, Dict, Iterator, List, Optional, cast
 
 from bibtexparser.bibdatabase import BibDatabase, UndefinedString
 from bibtexparser.bparser import BibTexParser
-from bibtexparser.bwriter import BibTexWriter
+from bibtexparser.bwriter import ENTRY_TO_BIBTEX_IGNORE_ENTRIES, BibTexWriter
 
 from ..utils.constants import EntryType, PathType
 from ..utils.functions import BTAC_File_Error
 from ..utils.logger import logger
+from .fastparser import parse
 
-ENTRY_SOURCE_COMMENT_KEY = "__btac_source_comment__"
+# Buffer size used when writing bibtex files
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Creating a BibTexParser builds its whole grammar, so a single one is
+# shared by all reads. Its database is reset before every parse.
+PARSER = BibTexParser(common_strings=True)
+PARSER.ignore_nonstandard_types = False  # Keep non standard entries if present
+PARSER.expect_multiple_parse = True
+PARSER_LOCK = Lock()
 
 
 class BTACBibTexWriter(BibTexWriter):
@@ -28,24 +38,65 @@ class BTACBibTexWriter(BibTexWriter):
         self.entry_source_comments = comments
 
     def _entry_to_bibtex(self, entry: EntryType) -> str:  # type: ignore[override]
+        # Comments are only stored in the entry_source_comments side table,
+        # so entries can be passed to the base writer without being copied
         comment: Optional[str] = None
         entry_id = entry.get("ID")
-        if ENTRY_SOURCE_COMMENT_KEY in entry:
-            comment = entry[ENTRY_SOURCE_COMMENT_KEY]
-        elif entry_id is not None:
+        if entry_id is not None:
             comment = self.entry_source_comments.get(entry_id)
-        if comment is not None:
-            entry = dict(entry)
-            entry.pop(ENTRY_SOURCE_COMMENT_KEY, None)
         bibtex_entry = super()._entry_to_bibtex(entry)
         if comment:
-            comment_lines = comment.splitlines()
             formatted_comment = "\n".join(
-                f"% {line}" if not line.startswith("%") else line for line in comment_lines
+                line if line.startswith("%") else f"% {line}" for line in comment.splitlines()
             )
             return f"{formatted_comment}\n{bibtex_entry}"
         return bibtex_entry
 
+    def _iter_entries_to_bibtex(self, database: BibDatabase) -> Iterator[str]:
+        """Same as _entries_to_bibtex, but yields entries one at a time"""
+        entries = database.entries
+        if self.order_entries_by:
+            entries = sorted(entries, key=lambda x: BibDatabase.entry_sort_key(x, self.order_entries_by))
+        if self.align_values is True:
+            widths = [len(ele) for entry in entries for ele in entry if ele not in ENTRY_TO_BIBTEX_IGNORE_ENTRIES]
+            self._max_field_width = max(widths, default=0)
+        elif type(self.align_values) is int:
+            self._max_field_width = self.align_values
+        for i, entry in enumerate(entries):
+            if i > 0:
+                yield self.entry_separator
+            yield self._entry_to_bibtex(entry)
+
+    def iter_bibtex(self, database: BibDatabase) -> Iterator[str]:
+        """Same as write, but yields the bibtex string in chunks
+        (one per entry) instead of building it all in memory"""
+        for content in self.contents:
+            if content == "entries":
+                yield from self._iter_entries_to_bibtex(database)
+            else:
+                yield getattr(self, "_" + content + "_to_bibtex")(database)
+
+    def write_to_stream(self, database: BibDatabase, stream: IO[str]) -> None:
+        """Writes the same output as write(database, self) to stream,
+        one chunk at a time. Trailing whitespace is held back until more
+        text follows, to match write's final strip"""
+        started = False
+        pending = ""
+        for chunk in self.iter_bibtex(database):
+            if not started:
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                started = True
+            text = chunk.rstrip()
+            if text:
+                stream.write(pending)
+                stream.write(text)
+                pending = chunk[len(text) :]
+            else:
+                pending += chunk
+        stream.write("\n")
+
 
 def make_writer() -> BibTexWriter:
     writer = BTACBibTexWriter()
@@ -61,13 +112,19 @@ def write(database: BibDatabase, writer: BibTexWriter) -> str:
     return cast(str, writer.write(database).strip() + "\n")
 
 
-def read(bibtex: str, src: str = "") -> BibDatabase:
-    """Parses bibtex string into database"""
-    parser = BibTexParser(common_strings=True)
-    # Keep non standard entries if present
-    parser.ignore_nonstandard_types = False
+def read(bibtex: str, src: str = "", legacy_parser: bool = False) -> BibDatabase:
+    """Parses bibtex string into database
+    Uses the fast parser when possible, bibtexparser otherwise (or if legacy_parser is set)"""
+    if not legacy_parser:
+        fast = parse(bibtex)
+        if fast is not None:
+            return fast
+        logger.debug("Fast parser unsupported input, falling back to bibtexparser")
     try:
-        database = parser.parse(bibtex)
+        with PARSER_LOCK:
+            PARSER.bib_database = BibDatabase()
+            PARSER.bib_database.load_common_strings()
+            database = PARSER.parse(bibtex)
     except UndefinedString as err:
         src = " '" + src + "'" if src else ""
         logger.critical(
@@ -82,14 +139,17 @@ def read(bibtex: str, src: str = "") -> BibDatabase:
 
 
 def file_write(filepath: PathType, database: BibDatabase, writer: BibTexWriter) -> bool:
-    """Writes database to given file, stdout if None"""
-    output = write(database, writer)
+    """Writes database to given file, stdout if None
+    Entries are streamed to the file instead of first building the whole output"""
     if filepath is None:
-        print(output)
+        print(write(database, writer))
         return True
     try:
-        with open(filepath, "w", encoding="utf-8") as file:
-            file.write(output)
+        with open(filepath, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as file:
+            if isinstance(writer, BTACBibTexWriter):
+                writer.write_to_stream(database, file)
+            else:
+                file.write(write(database, writer))
     except (IOError, UnicodeDecodeError) as err:
         logger.error(
             "Failed to write to '{filepath}' : {FgPurple}{err}{Reset}",
@@ -100,7 +160,7 @@ def file_write(filepath: PathType, database: BibDatabase, writer: BibTexWriter)
     return True
 
 
-def file_read(filepath: PathType) -> BibDatabase:
+def file_read(filepath: PathType, legacy_parser: bool = False) -> BibDatabase:
     """reads the given file, parses and normalizes it"""
     # Read and parse the file
     try:
@@ -115,7 +175,7 @@ def file_read(filepath: PathType) -> BibDatabase:
         raise BTAC_File_Error(
             "Failed to read '{filepath}': {err}".format(filepath=str(filepath), err=err), err
         ) from None
-    return read(bibtex, str(filepath))
+    return read(bibtex, str(filepath), legacy_parser)
 
 
 def get_entries(db: BibDatabase) -> List[EntryType]:
@@ -3,6 +3,7 @@ Functions used to normalize bibtex fields
 """
 
 import unicodedata
+from functools import lru_cache
 from re import search, sub
 from typing import Optional, Tuple
 from urllib.parse import parse_qsl, quote, urlencode, urljoin, urlsplit
@@ -60,6 +61,9 @@ def strip_accents(string: str) -> str:
     return "".join(c for c in unicodedata.normalize("NFD", string) if unicodedata.category(c) != "Mn")
 
 
+# String normalizations are cached: the same titles are compared against
+# the results of every lookup
+@lru_cache(maxsize=4096)
 def normalize_str_weak(string: str, from_latex: bool = True) -> str:
     """Converts to lower case, strips accents,
     replace tabs and newline with spaces,
@@ -72,6 +76,7 @@ def normalize_str_weak(string: str, from_latex: bool = True) -> str:
     return sub(r"\s+", " ", string)
 
 
+@lru_cache(maxsize=4096)
 def normalize_str(string: str) -> str:
     """Normalize string for decent comparison
     Converts to lower case, strips accents
@@ -80,23 +85,17 @@ def normalize_str(string: str) -> str:
     s = safe_latex_to_unicode(string)
     if s is not None:
         string = s
-    res = ""
-    prev_space = False
-    for x in strip_accents(string):
-        if x.isalnum():
-            res += x
-            prev_space = False
-        elif not prev_space:
-            res += " "
-            prev_space = True
-    return res.lower().strip()
+    # [\W_] matches exactly the characters for which str.isalnum() is False
+    return sub(r"[\W_]+", " ", strip_accents(string)).lower().strip()
 
 
 DOI_REGEX = r"(10\.\d{4,5}\/[\S]+[^;,.\s])$"
 
 
+@lru_cache(maxsize=4096)
 def normalize_doi(doi_or_url: Optional[str]) -> Optional[str]:
-    """Returns doi to canonical form (i.e. removing url)"""
+    """Returns doi to canonical form (i.e. removing url)
+    Cached, as results often repeat the same DOIs (e.g. zbMATH's links)"""
     if doi_or_url is not None:
         match = search(DOI_REGEX, doi_or_url)
         if match is not None:
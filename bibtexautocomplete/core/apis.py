@@ -1,27 +1,20 @@
-from typing import List
+from typing import Dict
 
-from ..APIs.arxiv import ArxivLookup
-from ..APIs.crossref import CrossrefLookup
-from ..APIs.dblp import DBLPLookup
-from ..APIs.inspire_hep import InpireHEPLookup
-from ..APIs.openalex import OpenAlexLookup
-from ..APIs.researchr import ResearchrLookup
-from ..APIs.semantic_scholar import SemanticScholarLookup
-from ..APIs.unpaywall import UnpaywallLookup
-from ..APIs.zbmath import ZbMathLookup
-from ..lookups.abstract_entry_lookup import LookupType
+from .registry import LookupRegistry
 
-# List of lookup to use, in the order they will be used
-LOOKUPS: List[LookupType] = [
-    OpenAlexLookup,
-    CrossrefLookup,
-    ArxivLookup,
-    SemanticScholarLookup,
-    UnpaywallLookup,
-    DBLPLookup,
-    ResearchrLookup,
-    InpireHEPLookup,
-    ZbMathLookup,
-]
-LOOKUPS.append(ZbMathLookup)
-LOOKUP_NAMES = [cls.name for cls in LOOKUPS]
+# Lookups to use, in the order they will be used
+# Maps each lookup name to its "module:class" in the APIs package.
+# Modules are only imported when the lookup is used, see LookupRegistry.get
+LOOKUPS: Dict[str, str] = {
+    "openalex": "openalex:OpenAlexLookup",
+    "crossref": "crossref:CrossrefLookup",
+    "arxiv": "arxiv:ArxivLookup",
+    "s2": "semantic_scholar:SemanticScholarLookup",
+    "unpaywall": "unpaywall:UnpaywallLookup",
+    "dblp": "dblp:DBLPLookup",
+    "researchr": "researchr:ResearchrLookup",
+    "hep": "inspire_hep:InpireHEPLookup",
+    "zbmath": "zbmath:ZbMathLookup",
+}
+
+REGISTRY = LookupRegistry(LOOKUPS)
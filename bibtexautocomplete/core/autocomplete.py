@@ -46,7 +46,9 @@ from ..bibtex.normalize import (
     has_field,
     prefer_journal_over_fjournal,
 )
-from ..lookups.abstract_entry_lookup import LookupType
+from ..lookups.abstract_entry_lookup import LookupResult, LookupType
+from ..lookups.cache import ResponseCache, default_cache_path
+from ..lookups.etiquette import Etiquette
 from ..lookups.https import HTTPSLookup
 from ..utils.ansi import ANSICodes
 from ..utils.constants import (
@@ -58,6 +60,7 @@ from ..utils.constants import (
     MAX_THREAD_NB,
     SKIP_QUERIES_IF_DELAY,
     SKIP_QUERIES_IF_REMAINING,
+    WORKERS,
     AuthorType,
     EntryType,
     PathType,
@@ -65,7 +68,7 @@ from ..utils.constants import (
 from ..utils.functions import BTAC_CLI_Error
 from ..utils.logger import VERBOSE_INFO, Hint, logger
 from ..utils.only_exclude import OnlyExclude
-from .apis import LOOKUPS
+from .apis import REGISTRY
 from .data_dump import DataDump
 from .parser import indent_string
 from .threads import LookupThread
@@ -135,6 +138,8 @@ class BibtexAutocomplete(Iterable[EntryType]):
     copy_doi_to_url: bool
     filter_by_entrytype: Literal["no", "required", "optional", "all"]
     dont_skip_slow_queries: bool
+    workers: int  # Concurrent queries to each lookup
+    legacy_parser: bool
     writer: BibTexWriter
 
     changed_fields: int
@@ -153,7 +158,7 @@ class BibtexAutocomplete(Iterable[EntryType]):
     def __init__(
         self,
         *,
-        lookups: Iterable[LookupType] = LOOKUPS,
+        lookups: Optional[Iterable[LookupType]] = None,  # Defaults to all lookups
         entries: Optional[Container[str]] = None,
         mark: bool = False,
         ignore_mark: bool = False,
@@ -173,6 +178,12 @@ class BibtexAutocomplete(Iterable[EntryType]):
         dont_skip_slow_queries: bool = False,
         timeout: Optional[float] = CONNECTION_TIMEOUT,  # Timeout on all queries, in seconds
         ignore_ssl: bool = False,  # Bypass SSL verification
+        no_cache: bool = False,  # Don't use the persistent response cache
+        refresh_cache: bool = False,  # Ignore cached responses, but update the cache
+        workers: int = WORKERS,  # Number of concurrent queries to each source
+        mailto: Optional[str] = None,  # Contact email sent to the sources
+        project_url: Optional[str] = None,  # Project URL sent to the sources
+        legacy_parser: bool = False,  # Always parse with bibtexparser, instead of the faster parser
         verbose: int = 0,  # Verbosity level, from 4 (very verbose debug) to -3 (no output)
         # Output formatting
         align_values: bool = False,
@@ -189,6 +200,16 @@ class BibtexAutocomplete(Iterable[EntryType]):
             ANSICodes.auto_colors(color)
         HTTPSLookup.connection_timeout = timeout if isinstance(timeout, float) and timeout > 0.0 else None
         HTTPSLookup.ignore_ssl = ignore_ssl
+        HTTPSLookup.refresh_cache = refresh_cache
+        etiquette = Etiquette()
+        HTTPSLookup.etiquette = etiquette._replace(
+            email=etiquette.email if mailto is None else mailto,
+            url=etiquette.url if project_url is None else project_url,
+        )
+        if no_cache:
+            HTTPSLookup.response_cache = None
+        elif HTTPSLookup.response_cache is None:
+            HTTPSLookup.response_cache = ResponseCache.open(default_cache_path())
         logger.set_verbosity(verbose)
 
         self.writer = make_writer()
@@ -202,7 +223,7 @@ class BibtexAutocomplete(Iterable[EntryType]):
         if fields_to_overwrite is None:
             fields_to_overwrite = set()
         self.bibdatabases = []
-        self.lookups = list(lookups)
+        self.lookups = list(REGISTRY.lookups if lookups is None else lookups)
         self.fields_to_complete = fields_to_complete
         self.entries = OnlyExclude(None, None) if entries is None else entries
         self.fields_to_overwrite = fields_to_complete & fields_to_overwrite
@@ -228,6 +249,8 @@ class BibtexAutocomplete(Iterable[EntryType]):
         self.not_found_log_path = self._prepare_log_file(not_found_log_path)
         self.multiple_hits_log_path = self._prepare_log_file(multiple_hits_log_path)
         self.replace_entry = replace_entry
+        self.workers = workers
+        self.legacy_parser = legacy_parser
 
     @staticmethod
     def _prepare_log_file(path: Optional[PathType]) -> Optional[Path]:
@@ -316,7 +339,7 @@ class BibtexAutocomplete(Iterable[EntryType]):
         # Create all threads
         condition = Condition()
         threads: List[LookupThread] = [
-            LookupThread(lookup, bib_entries, to_complete, condition) for lookup in self.lookups
+            LookupThread(lookup, bib_entries, to_complete, condition, self.workers) for lookup in self.lookups
         ]
         condition.acquire()
         for thread in threads:
@@ -367,7 +390,7 @@ class BibtexAutocomplete(Iterable[EntryType]):
                             hasattr(thread.lookup, "query_delay") and thread.lookup.query_delay >= SKIP_QUERIES_IF_DELAY
                         ):
                             thread.skip_to_end = True
-                            thread.result += [(None, dict())] * remaining
+                            thread.result += [LookupResult(None, dict())] * remaining
                             thread.position = nb_entries
                             logger.warn(
                                 f"[{{FgBlue}}{thread.name}{{Reset}}] Skipping last {remaining} queries since the"
@@ -683,7 +706,7 @@ class BibtexAutocomplete(Iterable[EntryType]):
                 length=length,
                 file=file,
             )
-            dbs.append(file_read(file))
+            dbs.append(file_read(file, self.legacy_parser))
         nb_entries = sum(len(get_entries(db)) for db in dbs)
         logger.info(
             "Read {nb_entries} {entry} from {total} {file}",
@@ -700,7 +723,7 @@ class BibtexAutocomplete(Iterable[EntryType]):
         if not isinstance(strings, list):
             strings = [strings]
         for string in strings:
-            self.bibdatabases.append(read(string))
+            self.bibdatabases.append(read(string, legacy_parser=self.legacy_parser))
 
     def convert_authors(self, entry: EntryType, field: Literal["author", "editor"]) -> EntryType:
         """Convert authors from {'firstname':str|None, 'lastname':str} to a single bibtex string"""
@@ -5,9 +5,11 @@ from typing import Any, Callable, Container, List, Optional, Set
 
 from ..bibtex.constants import FieldNamesSet, FieldType, SearchedFields
 from ..bibtex.io import write
+from ..lookups.cache import default_cache_path
 from ..utils.ansi import ANSICodes, ansi_format
 from ..utils.constants import (
     CONNECTION_TIMEOUT,
+    EMAIL,
     FIELD_PREFIX,
     LICENSE,
     MARKED_FIELD,
@@ -15,11 +17,12 @@ from ..utils.constants import (
     URL,
     VERSION_DATE,
     VERSION_STR,
+    WORKERS,
 )
 from ..utils.functions import BTAC_CLI_Error, BTAC_File_Error, list_sort_using, list_unduplicate
 from ..utils.logger import logger
 from ..utils.only_exclude import OnlyExclude
-from .apis import LOOKUP_NAMES, LOOKUPS
+from .apis import REGISTRY
 from .autocomplete import BibtexAutocomplete
 from .parser import (
     HELP_TEXT,
@@ -103,9 +106,12 @@ def main(argv: Optional[List[str]] = None) -> int:
             ansi_format(
                 HELP_TEXT,
                 TIMEOUT=CONNECTION_TIMEOUT,
+                WORKERS=WORKERS,
+                EMAIL=EMAIL,
+                CACHE_PATH=default_cache_path(),
                 VERSION=VERSION_STR,
                 VERSION_DATE=VERSION_DATE,
-                LOOKUPS=", ".join(LOOKUP_NAMES),
+                LOOKUPS=", ".join(REGISTRY.names),
                 NAME=SCRIPT_NAME,
                 URL=URL,
                 LICENSE=LICENSE,
@@ -137,7 +143,7 @@ def main(argv: Optional[List[str]] = None) -> int:
     else:
         args.output = make_output_names(args.input, args.output)
 
-    lookups = OnlyExclude[str].from_nonempty(args.only_query, args.dont_query).filter(LOOKUPS, lambda x: x.name)
+    lookup_names = OnlyExclude[str].from_nonempty(args.only_query, args.dont_query).filter(REGISTRY.names, lambda x: x)
     if args.only_query != [] and args.dont_query != []:
         return conflict(parser, "a ", "-q/--only-query", "-Q/--dont-query")
     if args.only_query != []:
@@ -146,7 +152,7 @@ def main(argv: Optional[List[str]] = None) -> int:
         if dups:
             # Print set without leading and ending brace
             logger.warn("Duplicate '-q' arguments ignored: {set}", set=str(dups)[1:-1])
-        lookups = list_sort_using(lookups, args.only_query, lambda x: x.name)
+        lookup_names = list_sort_using(lookup_names, args.only_query, lambda x: x)
     if args.replace_entry and args.only_query == []:
         try:
             parser.error(
@@ -204,7 +210,7 @@ def main(argv: Optional[List[str]] = None) -> int:
 
     try:
         completer = BibtexAutocomplete(
-            lookups=lookups,
+            lookups=REGISTRY.get_lookups(lookup_names),
             entries=entries,
             mark=args.mark,
             ignore_mark=args.ignore_mark,
@@ -219,7 +225,13 @@ def main(argv: Optional[List[str]] = None) -> int:
             start_from=args.start_from,
             dont_skip_slow_queries=args.no_skip,
             timeout=args.timeout,
+            workers=args.workers,
             ignore_ssl=args.ignore_ssl,
+            no_cache=args.no_cache,
+            refresh_cache=args.refresh_cache,
+            mailto=args.mailto,
+            project_url=args.project_url,
+            legacy_parser=args.legacy_parser,
             align_values=args.align_values,
             comma_first=args.comma_first,
             no_trailing_comma=args.no_trailing_comma,
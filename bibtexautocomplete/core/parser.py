@@ -11,10 +11,10 @@ from typing import TYPE_CHECKING, Iterable, List, NoReturn, Optional, TypeVar
 
 from ..bibtex.constants import FieldNamesSet
 from ..utils.ansi import ANSICodes
-from ..utils.constants import BTAC_FILENAME, CONNECTION_TIMEOUT, SCRIPT_NAME
+from ..utils.constants import BTAC_FILENAME, CONNECTION_TIMEOUT, SCRIPT_NAME, WORKERS
 from ..utils.functions import BTAC_CLI_Error, BTAC_File_Error
 from ..utils.logger import logger
-from .apis import LOOKUP_NAMES
+from .apis import REGISTRY
 
 T = TypeVar("T")
 
@@ -133,8 +133,8 @@ def make_parser() -> MyParser:
         usage="btac [--options] <input_files>\nSee help for a list of options.\n",
     )
 
-    parser.add_argument("--dont-query", "-Q", action="append", default=[], choices=LOOKUP_NAMES)
-    parser.add_argument("--only-query", "-q", action="append", default=[], choices=LOOKUP_NAMES)
+    parser.add_argument("--dont-query", "-Q", action="append", default=[], choices=REGISTRY.names)
+    parser.add_argument("--only-query", "-q", action="append", default=[], choices=REGISTRY.names)
     parser.add_argument("--replace-entry", "-R", action="store_true")
     parser.add_argument("--dont-complete", "-C", action="append", default=[], choices=FIELD_NAMES)
     parser.add_argument("--only-complete", "-c", action="append", default=[], choices=FIELD_NAMES)
@@ -165,6 +165,7 @@ def make_parser() -> MyParser:
     parser.add_argument("--ignore-mark", "-M", action="store_true")
 
     parser.add_argument("--timeout", "-t", type=float, default=CONNECTION_TIMEOUT)
+    parser.add_argument("--workers", type=int, default=WORKERS)
     parser.add_argument("--verbose", "-v", action="count", default=0)
 
     parser.add_argument("--silent", "-s", action="count", default=0)
@@ -175,6 +176,11 @@ def make_parser() -> MyParser:
         default="auto",
     )
     parser.add_argument("--ignore-ssl", "-S", action="store_true")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--refresh-cache", action="store_true")
+    parser.add_argument("--mailto")
+    parser.add_argument("--project-url")
+    parser.add_argument("--legacy-parser", action="store_true")
 
     parser.add_argument("--version", action="store_true")
     parser.add_argument("--help", "-h", action="store_true")
@@ -279,7 +285,17 @@ More information and demo:
 
   {FgYellow}-t --timeout{Reset} {FgGreen}<float>{Reset}  set timeout on request, default: {TIMEOUT} s
         Set to -1 for no timeout.
+  {FgYellow}--workers{Reset} {FgGreen}<int>{Reset}       number of concurrent queries to each source, default: {WORKERS}
+        Queries still respect each source's rate limit.
   {FgYellow}-S --ignore-ssl{Reset}       Ignore SSL verification when performing queries
+  {FgYellow}--no-cache{Reset}            Don't read or write the response cache. By default, responses
+        are cached in {CACHE_PATH} and reused on later runs
+  {FgYellow}--refresh-cache{Reset}       Query all sources again, ignoring (but updating) cached responses
+  {FgYellow}--mailto{Reset} {FgGreen}<email>{Reset}      contact email sent to the sources, default: {EMAIL}
+        Some sources (Crossref, OpenAlex) answer identified queries faster
+  {FgYellow}--project-url{Reset} {FgGreen}<url>{Reset}   project URL sent in the User-Agent, default: {URL}
+  {FgYellow}--legacy-parser{Reset}       Always parse input files with bibtexparser. By default, a faster
+        parser is used for files that only use common bibtex features
   {FgYellow}--ns --no-skip{Reset}        By default, btac will skip queries to some sources
         if they lag behind while 2/3 of the others have finished, saving time.
         This disables skipping.
@@ -0,0 +1,55 @@
+from contextlib import contextmanager
+from importlib import import_module
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple, cast
+
+from ..lookups.abstract_entry_lookup import LookupType
+
+
+class LookupRegistry:
+    """The lookups btac can use, by name, in the order they will be used.
+    Lookup modules are only imported when the lookup is first used, see get
+
+    The available names are an immutable tuple, only ever replaced as a whole.
+    Imported lookups are added to loaded as they are first used (see get), and
+    override temporarily replaces paths, names and loaded altogether"""
+
+    paths: Mapping[str, str]  # Lookup names to "module:class" in the APIs package
+    names: Tuple[str, ...]
+    loaded: Dict[str, LookupType]  # Lookup classes already imported, by name
+
+    def __init__(self, paths: Mapping[str, str]) -> None:
+        self.paths = paths
+        self.names = tuple(paths)
+        self.loaded = dict()
+
+    def get(self, name: str) -> LookupType:
+        """Return the lookup class with the given name, importing it if needed"""
+        lookup = self.loaded.get(name)
+        if lookup is None:
+            module, _, cls = self.paths[name].partition(":")
+            lookup = cast(LookupType, getattr(import_module("..APIs." + module, __package__), cls))
+            self.loaded[name] = lookup
+        return lookup
+
+    def get_lookups(self, names: Iterable[str]) -> List[LookupType]:
+        """Return the lookup classes with the given names, in the same order"""
+        return [self.get(name) for name in names]
+
+    @property
+    def lookups(self) -> Tuple[LookupType, ...]:
+        """All available lookup classes, in order"""
+        return tuple(self.get_lookups(self.names))
+
+    @contextmanager
+    def override(self, lookups: Iterable[LookupType]) -> Iterator[None]:
+        """Temporarily replace the available lookups with the given ones
+        Other lookups can't be found by get until the context exits,
+        which restores the registry as it was"""
+        saved = self.paths, self.names, self.loaded
+        self.loaded = {lookup.name: lookup for lookup in lookups}
+        self.paths = dict()  # All lookups are already loaded
+        self.names = tuple(self.loaded)
+        try:
+            yield
+        finally:
+            self.paths, self.names, self.loaded = saved
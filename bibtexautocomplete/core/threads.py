@@ -1,33 +1,41 @@
+from concurrent.futures import Future
+from queue import SimpleQueue
 from threading import Condition, Thread
 from typing import Dict, List, Optional, Set, Tuple
 
 from ..bibtex.constants import FieldType
 from ..bibtex.entry import BibtexEntry
-from ..lookups.abstract_entry_lookup import LookupType
-from ..utils.logger import logger
-from ..utils.safe_json import JSONType
+from ..lookups.abstract_entry_lookup import LookupResult, LookupType
+from ..utils.logger import THREAD_INFO, logger
+
+# Entry position and the future to set to its result, sent to worker threads
+Query = Tuple[int, "Future[LookupResult]"]
 
 
 class LookupThread(Thread):
     """As we our I/O limited,
     we can use threads to perform queries
-    We create one thread per lookup, to keep query rate polite for each domain"""
+    We create one thread per lookup, to keep query rate polite for each domain
+
+    Entries are processed in batches of lookup.batch_size: the lookup first
+    gets a chance to resolve the whole batch with a single request
+    (see query_batch), the remaining entries are then queried one at a time,
+    or concurrently by a pool of workers threads if workers > 1.
+    Results are always stored in entry order
+
+    Like this thread, the workers are daemon threads, so exiting never
+    waits for queries whose results are no longer needed"""
 
     lookup: LookupType
     entries: List[BibtexEntry] = []  # Read only
     to_complete: List[Set[FieldType]] = []  # Read only
     condition: Condition
-    entry_name: Optional[str]
-    result: List[
-        Tuple[
-            Optional[BibtexEntry],
-            Dict[str, JSONType],
-        ]
-    ]  # Write
+    result: List[LookupResult]  # Write
 
     position: int
     nb_entries: int
     skip_to_end: bool
+    workers: int  # Number of concurrent queries
 
     def __init__(
         self,
@@ -35,6 +43,7 @@ class LookupThread(Thread):
         entries: List[BibtexEntry],
         to_complete: List[Set[FieldType]],
         condition: Condition,
+        workers: int = 1,
     ):
         self.entries = entries
         self.to_complete = to_complete
@@ -44,42 +53,117 @@ class LookupThread(Thread):
         self.nb_entries = len(entries)
         self.result = []
         self.skip_to_end = False
+        self.workers = max(workers, 1)
         super().__init__(name=lookup.name, daemon=True)
 
+    def query_entry(self, position: int, entry_name: str) -> LookupResult:
+        """Query the entry at the given position on its own
+        May run on a worker thread, so entry_name is only stored for that thread"""
+        THREAD_INFO.entry_name = entry_name
+        try:
+            entry = self.entries[position]
+            if self.lookup.fields.isdisjoint(self.to_complete[position]):
+                # Skip query (and lookup creation) as no fields need to be completed
+                logger.debug("Skipping query, no data to add")
+                return LookupResult(None, dict())
+            lookup = self.lookup(entry)
+            try:
+                return LookupResult(lookup.query(), lookup.get_last_query_info())
+            except Exception as err:
+                logger.traceback(
+                    "Uncaught exception when trying to autocomplete entry\n"
+                    f"Entry = {entry_name}\nWebsite = {self.name}",
+                    err,
+                )
+                return LookupResult(None, lookup.get_last_query_info())
+        finally:
+            THREAD_INFO.entry_name = None
+
+    def query_batch(self, start: int, end: int) -> Dict[int, LookupResult]:
+        """Query entries start to end (excluded) at once, if the lookup supports it
+        Returns the results found, indexed by entry position"""
+        if self.lookup.batch_size <= 1:
+            return dict()
+        positions = [pos for pos in range(start, end) if not self.lookup.fields.isdisjoint(self.to_complete[pos])]
+        if not positions:
+            return dict()
+        THREAD_INFO.entry_name = self.entries[positions[0]].id
+        try:
+            found = self.lookup.query_batch([self.entries[pos] for pos in positions])
+        except Exception as err:
+            logger.traceback(
+                "Uncaught exception when trying to autocomplete entries\n"
+                f"Entries = {', '.join(self.entries[pos].id for pos in positions)}\n"
+                f"Website = {self.name}",
+                err,
+            )
+            return dict()
+        finally:
+            THREAD_INFO.entry_name = None
+        return {positions[index]: value for index, value in found.items()}
+
     def run(self) -> None:
-        """Starts querying for entries"""
+        """Starts querying for entries, by batches of lookup.batch_size"""
         logger.very_verbose_debug("Starting thread {name}", name=self.name)
+        if self.workers <= 1:
+            return self.process(None)
+        queries: "SimpleQueue[Optional[Query]]" = SimpleQueue()
+        for _ in range(self.workers):
+            # Workers are named after the lookup, for log messages
+            Thread(target=self.work, args=(queries,), name=self.name, daemon=True).start()
+        try:
+            return self.process(queries)
+        finally:
+            for _ in range(self.workers):
+                queries.put(None)
+
+    def work(self, queries: "SimpleQueue[Optional[Query]]") -> None:
+        """Worker thread: run the queries received until given None
+        Skips queries whose future was cancelled"""
+        while True:
+            query = queries.get()
+            if query is None:
+                return None
+            position, future = query
+            if future.set_running_or_notify_cancel():
+                future.set_result(self.query_entry(position, self.entries[position].id))
+
+    def process(self, queries: "Optional[SimpleQueue[Optional[Query]]]") -> None:
+        """Query all entries, sending single queries to the worker threads if any"""
+        step = self.lookup.batch_size if queries is None or self.lookup.batch_size > 1 else self.workers
         self.condition.acquire()
         while self.position < self.nb_entries:
-            entry = self.entries[self.position]
-            self.entry_name = entry.id
-            lookup = self.lookup(entry)
+            start = self.position
             self.condition.release()
 
-            if lookup.fields.isdisjoint(self.to_complete[self.position]):
-                # Skip query as no fields need to be completed
-                result = None
-                info = dict()
-                logger.debug("Skipping query, no data to add")
-            else:
-                try:
-                    result = lookup.query()
-                    info = lookup.get_last_query_info()
-                except Exception as err:
-                    result = None
-                    info = lookup.get_last_query_info()
-                    logger.traceback(
-                        "Uncaught exception when trying to autocomplete entry\n"
-                        f"Entry = {self.entry_name}\n"
-                        f"Website = {self.name}",
-                        err,
-                    )
-            if self.skip_to_end:
-                return None
+            end = min(start + step, self.nb_entries)
+            found = self.query_batch(start, end)
+            pending: Dict[int, Future[LookupResult]] = dict()
+            if queries is not None:
+                for position in range(start, end):
+                    if position not in found:
+                        pending[position] = Future()
+                        queries.put((position, pending[position]))
+            try:
+                for position in range(start, end):
+                    result = found.get(position)
+                    if result is None:
+                        future = pending.pop(position, None)
+                        if future is None:
+                            result = self.query_entry(position, self.entries[position].id)
+                        else:
+                            result = future.result()
+                    if self.skip_to_end:
+                        return None
 
+                    with self.condition:
+                        self.result.append(result)
+                        self.position += 1
+                        self.condition.notify()
+            finally:
+                # Only set when returning early, cancel queries that haven't started yet
+                for future in pending.values():
+                    future.cancel()
             self.condition.acquire()
-            self.result.append((result, info))
-            self.position += 1
-            self.condition.notify()
         self.condition.release()
         return None
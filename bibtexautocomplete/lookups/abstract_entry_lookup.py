@@ -3,13 +3,22 @@ This modules specializes the classes in AbstractBase to use BibtexEntry as data
 type. It is separate to avoid circular imports
 """
 
-from typing import Set, Type
+from typing import ClassVar, Dict, List, NamedTuple, Optional, Set, Type
 
 from ..bibtex.constants import FieldType
 from ..bibtex.entry import BibtexEntry
+from ..utils.safe_json import JSONType
 from .abstract_base import AbstractLookup
 
 
+class LookupResult(NamedTuple):
+    """Result of looking up an entry,
+    info is the extra information added to the data-dump"""
+
+    entry: Optional[BibtexEntry]
+    info: Dict[str, JSONType]
+
+
 class AbstractEntryLookup(AbstractLookup[BibtexEntry, BibtexEntry]):
     """Abstract minimal lookup,
     Implements simple __init__ putting the argument in self.entry
@@ -17,14 +26,28 @@ class AbstractEntryLookup(AbstractLookup[BibtexEntry, BibtexEntry]):
     Virtual methods and attributes : (must be overridden in children):
     - name : str
     - query: Self -> Optional[BibtexEntry]
+
+    Lookups whose API can answer for several entries in a single request
+    can set batch_size > 1 and override query_batch
     """
 
     entry: BibtexEntry
     fields: Set[FieldType]
 
+    # Maximum number of entries passed to query_batch at once
+    batch_size: ClassVar[int] = 1
+
     def __init__(self, input: BibtexEntry) -> None:
         super().__init__(input)
         self.entry = input
 
+    @classmethod
+    def query_batch(cls, entries: List[BibtexEntry]) -> Dict[int, LookupResult]:
+        """Look up multiple entries at once
+        Returns the results found, indexed by position in entries.
+        Entries without a result are then queried one at a time.
+        Default: no batch queries, every entry is queried on its own"""
+        return dict()
+
 
 LookupType = Type[AbstractEntryLookup]
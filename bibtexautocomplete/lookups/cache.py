@@ -0,0 +1,133 @@
+"""
+Persistent cache of HTTPS responses, stored in an sqlite database
+so that running btac again on the same entries doesn't query the APIs again
+"""
+
+import sqlite3
+from email.utils import parsedate_to_datetime
+from hashlib import sha1
+from os import environ
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import NamedTuple, Optional
+
+from ..utils.constants import CACHE_TTL, NAME, RATE_LIMITED_TTL, SERVER_ERROR_TTL
+from ..utils.logger import logger
+
+
+class CachedResponse(NamedTuple):
+    data: bytes
+    code: int
+    reason: str
+    expires: float  # Timestamp after which the response must be revalidated
+    etag: Optional[str]
+
+
+def default_cache_path() -> Path:
+    """Path of the cache database, in $XDG_CACHE_HOME (defaults to ~/.cache)"""
+    cache_home = environ.get("XDG_CACHE_HOME")
+    base = Path(cache_home) if cache_home else Path.home() / ".cache"
+    return base / NAME / "responses.sqlite"
+
+
+def cache_key(request: str, url: str) -> str:
+    """Key identifying a request in the cache"""
+    return sha1(f"{request} {url}".encode()).hexdigest()
+
+
+def response_expiry(cache_control: Optional[str], now: float) -> Optional[float]:
+    """Timestamp until which a response is fresh, according to its Cache-Control header
+    Returns None if the response must not be stored"""
+    expiry = now + CACHE_TTL
+    if cache_control is not None:
+        for directive in cache_control.lower().split(","):
+            name, _, value = directive.strip().partition("=")
+            if name == "no-store":
+                return None
+            if name == "no-cache":
+                expiry = now
+            elif name == "max-age":
+                try:
+                    expiry = now + int(value.strip('"'))
+                except ValueError:
+                    pass
+    return expiry
+
+
+def error_expiry(code: int, retry_after: Optional[str], now: float) -> Optional[float]:
+    """Timestamp until which an error response is reused instead of querying the source again,
+    according to its Retry-After header (in seconds or as a date).
+    Returns None for codes which aren't cached (only 429 and 5xx are)"""
+    if code == 429:
+        expiry = now + RATE_LIMITED_TTL
+    elif 500 <= code < 600:
+        expiry = now + SERVER_ERROR_TTL
+    else:
+        return None
+    if retry_after is not None:
+        retry_after = retry_after.strip()
+        if retry_after.isdigit():
+            return now + int(retry_after)
+        try:
+            return max(now, parsedate_to_datetime(retry_after).timestamp())
+        except (TypeError, ValueError):
+            pass
+    return expiry
+
+
+class ResponseCache:
+    """Persistent response cache, shared by all lookup threads
+    Never raises: database errors are logged and treated as cache misses"""
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+        self.lock = Lock()
+
+    @classmethod
+    def open(cls, path: Path) -> Optional["ResponseCache"]:
+        """Opens (or creates) the cache at the given path
+        Returns None if that fails"""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(path, check_same_thread=False)
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, data BLOB, code INTEGER, reason TEXT, expires REAL, etag TEXT)"
+                )
+                # Remove responses that expired long ago
+                connection.execute("DELETE FROM responses WHERE expires < ?", (time() - CACHE_TTL,))
+        except (OSError, sqlite3.Error) as err:
+            logger.warn("Failed to open response cache '{path}': {err}", path=path, err=err)
+            return None
+        return cls(connection)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Returns the cached response, None if absent"""
+        try:
+            with self.lock:
+                row = self.connection.execute(
+                    "SELECT data, code, reason, expires, etag FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as err:
+            logger.debug("Response cache read failed: {err}", err=err)
+            return None
+        if row is None:
+            return None
+        return CachedResponse(*row)
+
+    def set(self, key: str, response: CachedResponse) -> None:
+        """Adds or replaces a response in the cache"""
+        try:
+            with self.lock, self.connection:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, *response),
+                )
+        except sqlite3.Error as err:
+            logger.debug("Response cache write failed: {err}", err=err)
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,21 @@
+"""
+Identification sent to the APIs with every query.
+Some APIs (Crossref, OpenAlex) route identified traffic to a faster "polite" pool
+"""
+
+from typing import NamedTuple
+
+from ..utils.constants import EMAIL, NAME, URL, VERSION_STR
+
+
+class Etiquette(NamedTuple):
+    """Project and contact info, sent as User-Agent (and mailto parameter for some APIs)"""
+
+    name: str = NAME
+    version: str = VERSION_STR
+    url: str = URL
+    email: str = EMAIL
+
+    @property
+    def user_agent(self) -> str:
+        return f"{self.name}/{self.version} ({self.url}; mailto:{self.email})"
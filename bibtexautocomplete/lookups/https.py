@@ -2,18 +2,23 @@
 Lookup for HTTPS queries
 """
 
-from http.client import HTTPResponse, HTTPSConnection
+from atexit import register
+from http.client import HTTPResponse, HTTPSConnection, ImproperConnectionState
 from socket import gaierror, timeout
 from ssl import _create_unverified_context
+from threading import Lock, local
 from time import sleep, time
-from typing import Any, ClassVar, Dict, Optional
+from typing import Any, ClassVar, Dict, Optional, Tuple
 from urllib.parse import urlencode
+from weakref import WeakSet
 
 from ..bibtex.normalize import normalize_url
-from ..utils.constants import CONNECTION_TIMEOUT, MIN_QUERY_DELAY, USER_AGENT
+from ..utils.constants import CONNECTION_TIMEOUT, MIN_QUERY_DELAY
 from ..utils.logger import Hint, logger
 from ..utils.safe_json import JSONType
 from .abstract_base import AbstractDataLookup, Data, Input, Output
+from .cache import CachedResponse, ResponseCache, cache_key, error_expiry, response_expiry
+from .etiquette import Etiquette
 
 DNS_Fail_Hint = Hint("check your internet connection or DNS server")
 SSL_Fail_Hint = Hint(
@@ -23,6 +28,47 @@ SSL_Fail_Hint = Hint(
 )
 TIMEOUT_Hint = Hint("you can increase timeout with -t / --timeout option.")
 
+# Errors indicating a kept-alive connection was closed by the server
+STALE_CONNECTION_ERRORS = (BrokenPipeError, ConnectionResetError, ImproperConnectionState)
+# Request methods that can safely be sent again when a kept-alive connection was closed
+IDEMPOTENT_REQUESTS = ("GET", "HEAD")
+
+
+class ConnectionPool(local):
+    """Keep-alive connections, reused by all queries made from the same thread
+    by lookups with reuse_connections set.
+    As each lookup runs in its own thread, this saves a TCP and TLS handshake
+    on every query but the first one to a domain.
+    Connections are keyed by (domain, ignore_ssl, timeout)"""
+
+    connections: Dict[Tuple[str, bool, Optional[float]], HTTPSConnection]
+
+    def __init__(self) -> None:
+        self.connections = dict()
+
+
+CONNECTION_POOL = ConnectionPool()
+
+# All pooled connections still alive, from any thread, so they can be closed on exit.
+# Connections of finished threads are garbage collected with their pool
+OPEN_CONNECTIONS: "WeakSet[HTTPSConnection]" = WeakSet()
+OPEN_CONNECTIONS_LOCK = Lock()
+
+
+@register
+def close_connections() -> None:
+    """Close all pooled connections, instead of leaving them to the garbage collector"""
+    with OPEN_CONNECTIONS_LOCK:
+        connections = list(OPEN_CONNECTIONS)
+        OPEN_CONNECTIONS.clear()
+    for connection in connections:
+        connection.close()
+    CONNECTION_POOL.connections.clear()
+
+
+# Guards the query times of rate capped lookups, see HTTPSRateCapedLookup
+RATE_CAP_LOCK = Lock()
+
 
 class HTTPSLookup(AbstractDataLookup[Input, Output]):
     """Abstract class to wrap https queries:
@@ -39,6 +85,7 @@ class HTTPSLookup(AbstractDataLookup[Input, Output]):
 
     - request : str = "GET" - https request type
     - default_headers : Dict[str, str] = ... default http header
+    - etiquette : Etiquette - project and contact info, sent as User-Agent
     - headers : Dict[str, str] = {} - headers to add, overrite default_headers
 
     all of these have associated methods get_XX : Self -> Type[XX] that can be overridden
@@ -62,13 +109,25 @@ class HTTPSLookup(AbstractDataLookup[Input, Output]):
     request: str = "GET"
     accept: str = "application/json"
     default_headers: Dict[str, str] = {
-        "User-Agent": USER_AGENT,
         "Accept": accept,
     }
     headers: Dict[str, str] = {}
+    etiquette: ClassVar[Etiquette] = Etiquette()
 
     connection_timeout: Optional[float] = CONNECTION_TIMEOUT
 
+    # Persistent cache of responses, None when disabled
+    response_cache: ClassVar[Optional[ResponseCache]] = None
+    # Ignore cached responses (new responses are still stored)
+    refresh_cache: ClassVar[bool] = False
+    # Set to True in subclasses whose responses can be cached
+    cache_responses: ClassVar[bool] = False
+    # Set to True in subclasses that query the same few domains over and over,
+    # to keep their connections alive in CONNECTION_POOL.
+    # Others open a new connection per request, closed once the response is read
+    reuse_connections: ClassVar[bool] = False
+
+    connection: Optional[HTTPSConnection] = None  # Connection of the last request
     response: Optional[HTTPResponse] = None
 
     _last_query_info: Dict[str, JSONType] = {}
@@ -76,6 +135,7 @@ class HTTPSLookup(AbstractDataLookup[Input, Output]):
     def get_headers(self) -> Dict[str, str]:
         """Return the headers used in an HTTPS request"""
         headers = self.default_headers.copy()
+        headers["User-Agent"] = self.etiquette.user_agent
         headers["Accept"] = self.accept
         headers.update(self.headers)
         headers["Host"] = self.get_host()
@@ -121,6 +181,61 @@ class HTTPSLookup(AbstractDataLookup[Input, Output]):
         """Query body, can use self.entry to set them"""
         return None
 
+    def get_connection_key(self, domain: str) -> Tuple[str, bool, Optional[float]]:
+        return (domain, self.ignore_ssl, self.connection_timeout)
+
+    def drop_connection(self, domain: str) -> None:
+        """Close the connection of the last request to domain, if any"""
+        connection = self.connection
+        self.connection = None
+        if self.reuse_connections:
+            connection = CONNECTION_POOL.connections.pop(self.get_connection_key(domain), None)
+        if connection is not None:
+            connection.close()
+
+    def new_connection(self, domain: str) -> HTTPSConnection:
+        """Open a new connection to domain"""
+        if self.ignore_ssl:
+            return HTTPSConnection(
+                domain,
+                timeout=self.connection_timeout,
+                context=_create_unverified_context(),
+            )
+        return HTTPSConnection(domain, timeout=self.connection_timeout)
+
+    def send_request(self, domain: str, request: str, path: str, headers: Dict[str, str]) -> HTTPResponse:
+        """Send the request on a new connection to domain, or on this thread's
+        pooled connection to domain if reuse_connections is set.
+        If the server closed a pooled connection, idempotent requests are retried
+        once on a new one"""
+        if not self.reuse_connections:
+            self.connection = self.new_connection(domain)
+            self.connection.request(request, path, self.get_body(), headers)
+            return self.connection.getresponse()
+        key = self.get_connection_key(domain)
+        connection = CONNECTION_POOL.connections.get(key)
+        if connection is not None:
+            try:
+                connection.request(request, path, self.get_body(), headers)
+                return connection.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                self.drop_connection(domain)
+                if request not in IDEMPOTENT_REQUESTS:
+                    # The server may have received the request already
+                    raise
+                logger.very_verbose_debug("Kept-alive connection to {domain} was closed, reconnecting", domain=domain)
+        connection = self.new_connection(domain)
+        CONNECTION_POOL.connections[key] = connection
+        with OPEN_CONNECTIONS_LOCK:
+            OPEN_CONNECTIONS.add(connection)
+        connection.request(request, path, self.get_body(), headers)
+        return connection.getresponse()
+
+    def before_request(self) -> None:
+        """Called just before sending a request to the server
+        (i.e. not when the response is read from the cache)"""
+        pass
+
     def get_data(self) -> Optional[Data]:
         """main lookup function
         returns true if the lookup succeeded in finding all info
@@ -136,24 +251,25 @@ class HTTPSLookup(AbstractDataLookup[Input, Output]):
             request=request,
             url=url,
         )
+
+        key: Optional[str] = None
+        cached: Optional[CachedResponse] = None
+        cache = self.response_cache
+        if cache is not None and self.cache_responses and self.get_body() is None:
+            key = cache_key(request, url)
+            # Still read when refreshing, so errors don't replace a valid response
+            cached = cache.get(key)
+            if cached is not None and not self.refresh_cache:
+                if cached.expires > time():
+                    return self.cached_data(url, cached)
+                if cached.etag is not None:
+                    headers["If-None-Match"] = cached.etag
+
         logger.very_verbose_debug("headers: {headers}", headers=headers)
+        self.before_request()
         start = time()
         try:
-            if self.ignore_ssl:
-                connection = HTTPSConnection(
-                    domain,
-                    timeout=self.connection_timeout,
-                    context=_create_unverified_context(),
-                )
-            else:
-                connection = HTTPSConnection(domain, timeout=self.connection_timeout)
-            connection.request(
-                request,
-                path,
-                self.get_body(),
-                headers,
-            )
-            self.response = connection.getresponse()
+            self.response = self.send_request(domain, request, path, headers)
             delay = round(time() - start, 3)
             self._last_query_info = {
                 "url": url,
@@ -168,14 +284,17 @@ class HTTPSLookup(AbstractDataLookup[Input, Output]):
             )
             logger.very_verbose_debug("response headers: {headers}", headers=self.response.headers)
             data = self.response.read()
-            connection.close()
+            if self.response.will_close or not self.reuse_connections:
+                self.drop_connection(domain)
         except timeout:
+            self.drop_connection(domain)
             if self.silent_fail:
                 return None
             logger.warn("connection timeout ({timeout}s)", timeout=self.connection_timeout)
             TIMEOUT_Hint.emit()
             return None
         except (gaierror, OSError) as err:
+            self.drop_connection(domain)
             if self.silent_fail:
                 return None
             error_name = "CONNECTION ERROR"
@@ -191,6 +310,22 @@ class HTTPSLookup(AbstractDataLookup[Input, Output]):
             if hint is not None:
                 hint.emit()
             return None
+        if cache is not None and key is not None:
+            expires = response_expiry(self.response.getheader("Cache-Control"), time())
+            etag = self.response.getheader("ETag")
+            if cached is not None and "If-None-Match" in headers and self.response.status == 304:
+                # Not modified: the cached response can be used again
+                if expires is not None:
+                    cache.set(key, cached._replace(expires=expires, etag=etag or cached.etag))
+                return self.cached_data(url, cached, delay)
+            if expires is not None and self.response.status == 200:
+                cache.set(key, CachedResponse(data, self.response.status, self.response.reason, expires, etag))
+            elif cached is None or cached.code != 200:
+                # Rate limited or server error: don't query again until it is expected to work,
+                # but don't replace a successful response, which can still be used or revalidated
+                expires = error_expiry(self.response.status, self.response.getheader("Retry-After"), time())
+                if expires is not None:
+                    cache.set(key, CachedResponse(data, self.response.status, self.response.reason, expires, None))
         return Data(
             data=data,
             code=self.response.status,
@@ -198,6 +333,17 @@ class HTTPSLookup(AbstractDataLookup[Input, Output]):
             reason=self.response.reason,
         )
 
+    def cached_data(self, url: str, cached: CachedResponse, delay: float = 0.0) -> Data:
+        """Returns a cached response as Data"""
+        logger.debug("response {status} from cache", status=cached.code)
+        self._last_query_info = {
+            "url": url,
+            "response-time": delay,
+            "response-status": cached.code,
+            "cached": True,
+        }
+        return Data(data=cached.data, code=cached.code, delay=delay, reason=cached.reason)
+
     def get_last_query_info(self) -> Dict[str, JSONType]:
         base = dict()
         base.update(super().get_last_query_info())
@@ -248,13 +394,20 @@ class HTTPSRateCapedLookup(HTTPSLookup[Input, Output]):
         Override in subclasses to get delay request from query headers"""
         return None
 
-    def get_data(self) -> Optional[Data]:
-        since_last_query = time() - self.last_query_time
-        wait = self.query_delay - since_last_query
+    def before_request(self) -> None:
+        # Reserve the next query slot under the lock, so that concurrent
+        # workers of the same lookup still space out their queries
+        with RATE_CAP_LOCK:
+            now = time()
+            wait = self.last_query_time + self.query_delay - now
+            self.__class__.last_query_time = now + max(wait, 0.0)
         if wait >= 0.0:
             logger.debug("Rate limiter: sleeping for {wait}s", wait=round(wait, 3))
             sleep(wait)
-        self.__class__.last_query_time = time()
+        super().before_request()
+
+    def get_data(self) -> Optional[Data]:
+        self.response = None
         data = super().get_data()
         new_cap = self.update_rate_cap()  # update rate cap with response headers
         if new_cap is not None:
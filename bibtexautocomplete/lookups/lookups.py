@@ -16,7 +16,8 @@ class JSON_Lookup(
     EntryMatchSearchMixin[SafeJSON],
     HTTPSRateCapedLookup[BibtexEntry, BibtexEntry],
 ):
-    pass
+    cache_responses = True
+    reuse_connections = True
 
 
 class XML_Lookup(
@@ -24,4 +25,5 @@ class XML_Lookup(
     EntryMatchSearchMixin[Element],
     HTTPSRateCapedLookup[BibtexEntry, BibtexEntry],
 ):
-    pass
+    cache_responses = True
+    reuse_connections = True
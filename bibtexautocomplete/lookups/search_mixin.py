@@ -86,11 +86,13 @@ class SearchResultMixin(Generic[result]):
             logger.verbose_debug("no results")
             self._last_result_count = 0
             return None
-        res_list = list(results)
-        self._last_result_count = len(res_list)
+        # Count results as they are consumed, so lazy results
+        # (e.g. streamed by get_results) are never materialized as a list
+        self._last_result_count = 0
         max_score = ENTRY_NO_MATCH
         max_entry: Optional[BibtexEntry] = None
-        for res in res_list:
+        for res in results:
+            self._last_result_count += 1
             entry = self.get_value(res)
             score = self.match_score(entry, res)
             logger.verbose_debug("match {} for {}", score, entry)
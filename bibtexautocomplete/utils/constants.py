@@ -27,14 +27,17 @@ EMAIL = "dorian.lesbre" + chr(64) + "gmail.com"
 # Minimum delay between queries to same host, to avoid surcharging server
 MIN_QUERY_DELAY = 0.02  # s, so 50 per second
 CONNECTION_TIMEOUT = 20.0  # seconds
+WORKERS = 2  # Concurrent queries per source
+CACHE_TTL = 7 * 24 * 3600.0  # s, lifetime of cached responses without a Cache-Control max-age
+# s, lifetime of cached error responses without a Retry-After header
+RATE_LIMITED_TTL = 300.0  # 429 Too Many Requests
+SERVER_ERROR_TTL = 60.0  # 5xx
 
 # Skip last queries to sources if the lag behind while 2/3 of the others have
 # finished. This defines the "lag behind" criteria:
 SKIP_QUERIES_IF_REMAINING = 10  # queries
 SKIP_QUERIES_IF_DELAY = 60.0  # seconds
 
-USER_AGENT = f"{NAME}/{VERSION_STR} ({URL}; mailto:{EMAIL})"
-
 EntryType = Dict[str, str]  # Type of a bibtex entry
 PathType = Union[str, Path]
 
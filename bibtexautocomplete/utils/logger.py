@@ -4,8 +4,9 @@ Defining and configuring the logger
 
 import logging
 from sys import stderr, stdout, version
-from threading import current_thread, main_thread
+from threading import current_thread, local, main_thread
 from traceback import format_exc
+from typing import Optional
 
 from .ansi import ansi_format, ansiless_len
 from .constants import ISSUES_URL, NAME, VERSION_DATE, VERSION_STR
@@ -36,6 +37,15 @@ logging.addLevelName(VERY_VERBOSE_DEBUG, "VERY_VERBOSE_DEBUG")
 DEFAULT_LEVEL = logging.INFO
 
 
+class ThreadInfo(local):
+    """Per thread info added to log messages"""
+
+    entry_name: Optional[str] = None  # Entry currently processed by this thread
+
+
+THREAD_INFO = ThreadInfo()
+
+
 def prefix_indent(prefix: str, message: str) -> str:
     """Adds a prefix to the first line of message
     Indents all subsequent lines with spaces to be aligned to prefix"""
@@ -68,9 +78,8 @@ class Logger:
         current = current_thread()
         if current is not main_thread():
             info = "[{FgBlue}" + current.name + "{Reset}] "
-            entry_name = current.entry_name if hasattr(current, "entry_name") else None
-            if isinstance(entry_name, str):
-                info += "{StUnderline}" + entry_name + ":{Reset} "
+            if THREAD_INFO.entry_name is not None:
+                info += "{StUnderline}" + THREAD_INFO.entry_name + ":{Reset} "
             message = prefix_indent(info, message)
         return message
 
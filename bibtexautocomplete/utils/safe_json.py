@@ -3,18 +3,41 @@ A class for parsing JSON data without checking structure every time
 No operations will raise any error, invalid operations will simply return None
 """
 
+from functools import lru_cache
 from json import JSONDecodeError, JSONDecoder
-from typing import Dict, Iterator, List, Optional, Tuple, Union
+from operator import itemgetter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union, cast
 
 from .logger import logger
 
+# orjson is an optional dependency (see the perf extra), which decodes str
+# and bytes (directly) several times faster than the standard library's json module
+orjson_loads: Optional[Callable[[Union[bytes, str]], object]] = None
+try:
+    from orjson import loads
+
+    orjson_loads = loads
+except ImportError:
+    pass
+
 JSONType = Union[Dict[str, "JSONType"], List["JSONType"], int, float, str, bool, None]
+JSONKey = Union[int, str]
 
 
 log = logger.forget
 log_verbose = logger.forget
 
 
+def list_getter(index: int) -> Callable[[JSONType], JSONType]:
+    """Returns value[index] if value is a list, None otherwise
+    (a plain itemgetter would also index strings)"""
+
+    def get(value: JSONType) -> JSONType:
+        return value[index] if isinstance(value, list) else None
+
+    return get
+
+
 class SafeJSON:
     """class designed to make failess accesses to a JSON-like structure
     (recursive structure of either Dict[str, SafeJSON], List[SafeJSON], int, float, str, bool, None)
@@ -27,7 +50,7 @@ class SafeJSON:
     def __init__(self, value: JSONType) -> None:
         self.value = value
 
-    def __getitem__(self, key: Union[int, str]) -> "SafeJSON":
+    def __getitem__(self, key: JSONKey) -> "SafeJSON":
         result: JSONType = None
         if isinstance(key, int):
             if key >= 0 and isinstance(self.value, list) and len(self.value) > key:
@@ -42,19 +65,56 @@ class SafeJSON:
                 log("SafeJSON: access to {} on non-dict {}", repr(key), type(self.value))
         return SafeJSON(result)
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def path(keys: Tuple[JSONKey, ...]) -> "Callable[[SafeJSON], SafeJSON]":
+        """Compiles a sequence of accesses: SafeJSON.path(("a", 0, "b"))(json)
+        is the same as json["a"][0]["b"], without wrapping every intermediate value.
+        Should be built once (e.g. at import time) and reused"""
+        getters: List[Callable[[JSONType], JSONType]] = []
+        for key in keys:
+            if isinstance(key, str):
+                getters.append(cast(Callable[[JSONType], JSONType], itemgetter(key)))  # Fails on anything but a dict
+            elif key < 0:
+                raise ValueError("SafeJSON.path: negative list index")
+            else:
+                getters.append(list_getter(key))
+
+        def get(json: SafeJSON) -> SafeJSON:
+            value = json.value
+            try:
+                for getter in getters:
+                    value = getter(value)
+            except (KeyError, IndexError, TypeError):
+                return SafeJSON(None)
+            return SafeJSON(value)
+
+        return get
+
     @staticmethod
     def from_str(json: str) -> "SafeJSON":
         """Parses a json string into SafeJSON, returns SafeJSON(None) if invalid string"""
         try:
+            if orjson_loads is not None:
+                return SafeJSON(cast(JSONType, orjson_loads(json)))
             decoded = JSONDecoder().decode(json)
-        except JSONDecodeError:
+        except JSONDecodeError:  # orjson's errors subclass this one
             return SafeJSON(None)  # empty
         return SafeJSON(decoded)
 
     @staticmethod
     def from_bytes(json: bytes) -> "SafeJSON":
         """Parses a json bytes string into SafeJSON, returns SafeJSON(None) if invalid string"""
-        return SafeJSON.from_str(json.decode())
+        if orjson_loads is None:
+            try:
+                return SafeJSON.from_str(json.decode())
+            except UnicodeDecodeError:
+                return SafeJSON(None)
+        try:
+            decoded = orjson_loads(json)
+        except JSONDecodeError:  # orjson's errors subclass this one
+            return SafeJSON(None)
+        return SafeJSON(cast(JSONType, decoded))
 
     def dict_contains(self, key: str) -> bool:
         """Returns true if self is a dict and has the given key"""
@@ -0,0 +1,12 @@
+from pathlib import Path
+
+import pytest
+
+from bibtexautocomplete.lookups.https import HTTPSLookup
+
+
+@pytest.fixture(autouse=True)
+def response_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep each test's response cache in its own temporary directory"""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(HTTPSLookup, "response_cache", None)
@@ -74,6 +74,23 @@ def test_SafeJSON() -> None:
                 assert (i == 0) == x.to_bool()
 
 
+def test_SafeJSON_path() -> None:
+    a = SafeJSON({"a": 5, "b": "bonjour", "c": [1, 2, {"3": 5, "4": [True, False]}]})
+    assert SafeJSON.path(("c", 2, "4", 1))(a).to_bool() is False
+    assert SafeJSON.path(("c", 0))(a).to_int() == 1
+    for keys in [(0,), ("d",), ("a", "b"), ("b", 0), ("c", 3), ("c", "3"), ("c", 2, "4", 1, 0)]:
+        assert SafeJSON.path(keys)(a).value is None
+    with pytest.raises(ValueError):
+        SafeJSON.path(("c", -1))
+
+
+def test_SafeJSON_from_str() -> None:
+    assert SafeJSON.from_str('{"a": [1, "é"]}').value == {"a": [1, "é"]}
+    assert SafeJSON.from_str('{"a": [1,').value is None
+    assert SafeJSON.from_bytes('{"a": "é"}'.encode()).value == {"a": "é"}
+    assert SafeJSON.from_bytes(b"\xff").value is None
+
+
 test_undup = [
     ([], ([], set())),
     ([1, 7, 6], ([1, 7, 6], set())),
@@ -1,10 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterator, List, Optional, Tuple
+from random import Random
+from typing import Iterator, List, Optional, Set, Tuple
 
 import pytest
 
 from bibtexautocomplete.bibtex.author import Author
-from bibtexautocomplete.bibtex.base_field import ListField, StrictStringField
+from bibtexautocomplete.bibtex.base_field import ListField, StrictStringField, iterate_max
 from bibtexautocomplete.bibtex.constants import (
     ENTRY_CERTAIN_MATCH,
     ENTRY_NO_MATCH,
@@ -12,7 +14,8 @@ from bibtexautocomplete.bibtex.constants import (
     FIELD_NO_MATCH,
     FieldNames,
 )
-from bibtexautocomplete.bibtex.entry import BibtexEntry
+from bibtexautocomplete.bibtex.entry import ENTRY_MAX_MATCH, BibtexEntry
+from bibtexautocomplete.bibtex.fastparser import parse
 from bibtexautocomplete.bibtex.fields import (
     AbbreviatedStringField,
     DOIField,
@@ -23,8 +26,9 @@ from bibtexautocomplete.bibtex.fields import (
     PagesField,
     URLField,
     YearField,
+    is_abbrev,
 )
-from bibtexautocomplete.bibtex.io import file_read, make_writer, write
+from bibtexautocomplete.bibtex.io import BTACBibTexWriter, file_read, file_write, make_writer, read, write
 from bibtexautocomplete.bibtex.normalize import (
     normalize_doi,
     normalize_str,
@@ -33,6 +37,7 @@ from bibtexautocomplete.bibtex.normalize import (
     escape_latex_special_chars,
     prefer_journal_over_fjournal,
 )
+from bibtexautocomplete.utils.functions import BTAC_File_Error
 
 tests = [
     ("abc", "abc"),
@@ -56,6 +61,8 @@ tests = [
     ("ABC", "abc"),
     ("12 +*-/#.?:$%", "12"),
     ("àbcéèçôêâû+ÏÖÜÉÀÈÇÉ#!;§", "abceecoeau ioueaece"),
+    ("snake_case__title", "snake case title"),
+    ("  - leading, trailing -  ", "leading trailing"),
 ]
 
 
@@ -122,6 +129,91 @@ def test_io_1() -> None:
     io_test("tests/test_1.bib")
 
 
+@pytest.mark.parametrize(
+    ("comment", "expected"),
+    [
+        ("source: crossref", "% source: crossref"),
+        ("a\n\n", "% a\n% "),
+        ("a\n\nb", "% a\n% \n% b"),
+        ("a\r\nb", "% a\n% b"),
+        ("%already\nnot", "%already\n% not"),
+    ],
+)
+def test_entry_comments(comment: str, expected: str) -> None:
+    writer = make_writer()
+    assert isinstance(writer, BTACBibTexWriter)
+    writer.set_entry_source_comments({"a": comment})
+    database = read("@misc{a, title = {x}}")
+    assert write(database, writer) == expected + "\n@misc{a,\n\ttitle = {x},\n}\n"
+
+
+@pytest.mark.parametrize("file", ["tests/test_0.bib", "tests/test_1.bib", "tests/bibs/input.bib"])
+@pytest.mark.parametrize("align_values", [False, True])
+def test_file_write_matches_write(file: str, align_values: bool, tmp_path: Path) -> None:
+    database = file_read(Path(file))
+    database.comments.append("  trailing comment  \n\n")
+    writer = make_writer()
+    assert isinstance(writer, BTACBibTexWriter)
+    writer.align_values = align_values
+    ids = [entry["ID"] for entry in database.entries]
+    writer.set_entry_source_comments({ids[0]: "first\n\nentry", ids[-1]: "last entry  \n"})
+    output = tmp_path / "output.bib"
+    assert file_write(output, database, writer)
+    assert output.read_bytes() == write(database, writer).encode("utf-8")
+
+
+def test_reads_are_independent() -> None:
+    first = read("@string{foo = {bar}}\n@article{a, title = foo, month = jan}")
+    assert first.entries == [{"ENTRYTYPE": "article", "ID": "a", "title": "bar", "month": "January"}]
+    second = read("@misc{b, title = {x}, month = feb}")
+    assert second.entries == [{"ENTRYTYPE": "misc", "ID": "b", "title": "x", "month": "February"}]
+    assert "foo" not in second.strings
+    with pytest.raises(BTAC_File_Error):
+        read("@misc{c, title = foo}")
+
+
+@pytest.mark.parametrize("file", ["tests/test_0.bib", "tests/test_1.bib", "tests/test_2.bib", "tests/bibs/input.bib"])
+def test_fast_parser_matches_bibtexparser(file: str) -> None:
+    with open(file, encoding="utf-8") as stream:
+        bibtex = stream.read()
+    fast = parse(bibtex)
+    legacy = read(bibtex, legacy_parser=True)
+    assert fast is not None
+    assert fast.entries == legacy.entries
+    assert [list(entry) for entry in fast.entries] == [list(entry) for entry in legacy.entries]
+    assert fast.comments == legacy.comments
+
+
+fast_parser_tests = [
+    '@misc{a, Title = {x}, title = "y {"} z",\n\tnote = {multi\n   line},\n year = 2020, month = Jan,}',
+    "% comment\n@book{empty,\n}\n@comment{explicit {comment}}\n@misc{b, x={}}\ntrailing text",
+]
+
+
+@pytest.mark.parametrize("bibtex", fast_parser_tests)
+def test_fast_parser(bibtex: str) -> None:
+    fast = parse(bibtex)
+    legacy = read(bibtex, legacy_parser=True)
+    assert fast is not None
+    assert fast.entries == legacy.entries
+    assert fast.comments == legacy.comments
+
+
+@pytest.mark.parametrize(
+    "bibtex",
+    [
+        "@string{foo = {bar}}\n@misc{a, title = foo}",
+        "@preamble{x}",
+        "@misc{a, title = {x} # {y}}",
+        "@misc(a, title = {x})",
+        "@misc{a, title = undefined}",
+        "@misc{a, pages = 12--13}",
+    ],
+)
+def test_fast_parser_unsupported(bibtex: str) -> None:
+    assert parse(bibtex) is None
+
+
 authors = [
     ("John Jones", [Author("Jones", "John")]),
     (
@@ -178,6 +270,30 @@ def test_BibtexEntry_editor_set(author: str, res: List[Author]) -> None:
     assert b.editor.value == (res if res != [] else None)
 
 
+def test_BibtexEntry_lazy_fields() -> None:
+    entry = BibtexEntry("source", "id")
+    assert "title" not in entry
+    assert str(entry) == "Entry{}"
+    assert entry.fields() == set()
+    entry.title.set("A title")
+    assert entry.title is entry.get_field("title")
+    assert entry.title.source == "source" and entry.title.entry_id == "id"
+    assert entry.fields() == {"title"}
+    name = "not_a_field"
+    with pytest.raises(AttributeError):
+        getattr(entry, name)
+
+
+def test_BibtexEntry_lazy_fields_threads() -> None:
+    entries = [BibtexEntry("source", str(i)) for i in range(200)]
+    with ThreadPoolExecutor(8) as executor:
+        # Each entry is accessed by several threads at about the same time
+        fields = list(executor.map(lambda entry: entry.journal, [entry for entry in entries for _ in range(8)]))
+    for i, field in enumerate(fields):
+        # All threads got the field stored in the entry
+        assert field is entries[i // 8].journal
+
+
 def iterate_nested(list: List[List[str]]) -> Iterator[Tuple[int, str]]:
     """Iterate over a nested list, returning (index of sublist, element)"""
     for i, sublist in enumerate(list):
@@ -239,6 +355,19 @@ def test_matching() -> None:
     assert entry.matches(entry3) > ENTRY_NO_MATCH
 
 
+def test_matching_doi() -> None:
+    fields = {"title": "My awesome paper", "author": "Doe, John", "year": "2023"}
+    full = BibtexEntry.from_entry("test", {**fields, "doi": "10.1234/12345"})
+    # Same DOI is enough, even if other fields differ
+    same_doi = BibtexEntry.from_entry("test", {"doi": "https://doi.org/10.1234/ABCDE", "year": "2020"})
+    assert same_doi.matches(BibtexEntry.from_entry("test", {"doi": "10.1234/abcde"})) == ENTRY_MAX_MATCH
+    assert full.matches(full) == ENTRY_MAX_MATCH
+    assert full.matches(BibtexEntry.from_entry("test", fields)) < ENTRY_MAX_MATCH
+    # Different DOIs are matched on the other fields
+    other_doi = BibtexEntry.from_entry("test", {**fields, "doi": "10.48550/arXiv.1234.5678"})
+    assert ENTRY_NO_MATCH < full.matches(other_doi) < ENTRY_MAX_MATCH
+
+
 urls: List[Tuple[str, Optional[Tuple[str, str]]]] = [
     ("http://google.com", ("google.com", "")),
     ("https://google.com", ("google.com", "")),
@@ -340,6 +469,48 @@ def test_listify_match_merge(a: str, b: str, matches: bool, merged: Optional[str
         assert score <= FIELD_NO_MATCH
 
 
+def rescan_iterate_max(matrix: List[List[int]]) -> Iterator[Tuple[int, int]]:
+    """Reference implementation: rescan the remaining cells for each maximum"""
+    seen_x: Set[int] = set()
+    seen_y: Set[int] = set()
+    while True:
+        best: Optional[Tuple[int, int]] = None
+        for x, row in enumerate(matrix):
+            for y, value in enumerate(row):
+                if x in seen_x or y in seen_y or value <= FIELD_NO_MATCH:
+                    continue
+                if best is None or value > matrix[best[0]][best[1]]:
+                    best = (x, y)
+        if best is None:
+            return
+        seen_x.add(best[0])
+        seen_y.add(best[1])
+        yield best
+
+
+def test_iterate_max() -> None:
+    rand = Random(0)
+    for _ in range(200):
+        rows, cols = rand.randint(0, 6), rand.randint(1, 6)
+        matrix = [[rand.choice((-1, 0, 25, 50, 100)) for _ in range(cols)] for _ in range(rows)]
+        assert list(iterate_max(matrix)) == list(rescan_iterate_max(matrix))
+
+
+is_abbrev_tests: List[Tuple[str, str, bool]] = [
+    ("proc acm", "proceedings of the association for computer machinery", True),
+    ("j", "john", True),
+    ("j p", "jean pierre", True),
+    ("jr", "junior", False),
+    ("kph", "Kopenhaven", False),
+]
+
+
+@pytest.mark.parametrize(("abbrev", "text", "expected"), is_abbrev_tests)
+def test_is_abbrev(abbrev: str, text: str, expected: bool) -> None:
+    assert is_abbrev(abbrev, text) == expected
+    assert is_abbrev(abbrev, text) == expected  # cached
+
+
 author_match_merge: List[Tuple[str, str, bool, Optional[str]]] = [
     ("John Doe", "Doe, J.", True, "Doe, John"),
     ("Tolkien, J.R.R", "John Ronald Reuel Tolkien", True, "Tolkien, John Ronald Reuel"),
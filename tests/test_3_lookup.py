@@ -1,9 +1,20 @@
-from typing import Dict, List, NamedTuple, Optional
+from http.client import RemoteDisconnected
+from socket import timeout
+from threading import Condition, Event, Lock, current_thread
+from time import sleep
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, cast
 
+import pytest
+
+from bibtexautocomplete.bibtex.constants import FieldType
 from bibtexautocomplete.bibtex.entry import BibtexEntry
 from bibtexautocomplete.bibtex.normalize import normalize_str
+from bibtexautocomplete.core.threads import LookupThread
+from bibtexautocomplete.lookups import https
 from bibtexautocomplete.lookups.abstract_base import AbstractLookup
+from bibtexautocomplete.lookups.abstract_entry_lookup import LookupResult, LookupType
 from bibtexautocomplete.lookups.multiple_mixin import DAT_Query_Mixin
+from bibtexautocomplete.utils.logger import THREAD_INFO, logger
 
 
 class ToCheck(NamedTuple):
@@ -165,3 +176,256 @@ class ConditionEval(AbstractLookup[BibtexEntry, BibtexEntry]):
     def query(self) -> Optional[BibtexEntry]:
         self.queried = True
         return None
+
+
+class BatchEval(AbstractLookup[BibtexEntry, BibtexEntry]):
+    """Resolves even entries in batch, odd ones one at a time"""
+
+    name = "batch_eval"
+    batch_size = 3
+    fields = {"title"}
+    batches: List[List[str]] = []
+    single: List[str] = []
+
+    def __init__(self, entry: BibtexEntry) -> None:
+        self.entry = entry
+        super().__init__(entry)
+
+    @classmethod
+    def query_batch(cls, entries: List[BibtexEntry]) -> Dict[int, LookupResult]:
+        cls.batches.append([entry.id for entry in entries])
+        return {i: LookupResult(entry, {"batch": True}) for i, entry in enumerate(entries) if int(entry.id) % 2 == 0}
+
+    def query(self) -> Optional[BibtexEntry]:
+        self.single.append(self.entry.id)
+        return self.entry
+
+
+def test_thread_batches() -> None:
+    entries = [BibtexEntry("test", str(i)) for i in range(7)]
+    to_complete: List[Set[FieldType]] = [{"title"} for _ in entries]
+    to_complete[2] = set()  # nothing to complete: neither batched nor queried
+    thread = LookupThread(cast(LookupType, BatchEval), entries, to_complete, Condition())
+    thread.run()
+    assert BatchEval.batches == [["0", "1"], ["3", "4", "5"], ["6"]]
+    assert BatchEval.single == ["1", "3", "5"]
+    assert [bool(result.info) for result in thread.result] == [True, False, False, False, True, False, True]
+    assert [result.entry is None for result in thread.result] == [False, False, True, False, False, False, False]
+
+
+class SlowEval(AbstractLookup[BibtexEntry, BibtexEntry]):
+    """Lookup whose queries take longer for earlier entries"""
+
+    name = "slow_eval"
+    batch_size = 1
+    fields = {"title"}
+    lock = Lock()
+    running = 0
+    max_running = 0
+
+    def __init__(self, entry: BibtexEntry) -> None:
+        self.entry = entry
+        super().__init__(entry)
+
+    def query(self) -> Optional[BibtexEntry]:
+        with self.lock:
+            SlowEval.running += 1
+            SlowEval.max_running = max(SlowEval.max_running, SlowEval.running)
+        sleep(0.01 * (5 - int(self.entry.id) % 5))
+        with self.lock:
+            SlowEval.running -= 1
+        return self.entry
+
+
+def test_thread_workers() -> None:
+    entries = [BibtexEntry("test", str(i)) for i in range(10)]
+    to_complete: List[Set[FieldType]] = [{"title"} for _ in entries]
+    thread = LookupThread(cast(LookupType, SlowEval), entries, to_complete, Condition(), workers=4)
+    thread.run()
+    assert [result.entry.id if result.entry else None for result in thread.result] == [e.id for e in entries]
+    assert 1 < SlowEval.max_running <= 4
+
+
+class LoggingEval(AbstractLookup[BibtexEntry, BibtexEntry]):
+    name = "logging_eval"
+    batch_size = 1
+    fields = {"title"}
+
+    def __init__(self, entry: BibtexEntry) -> None:
+        self.entry = entry
+        super().__init__(entry)
+
+    def query(self) -> Optional[BibtexEntry]:
+        assert current_thread().daemon
+        logger.warn("querying {id}", id=self.entry.id)
+        return None
+
+
+def test_thread_workers_log_entry(caplog: pytest.LogCaptureFixture) -> None:
+    entries = [BibtexEntry("test", f"entry{i}") for i in range(6)]
+    to_complete: List[Set[FieldType]] = [{"title"} for _ in entries]
+    thread = LookupThread(cast(LookupType, LoggingEval), entries, to_complete, Condition(), workers=3)
+    thread.start()
+    thread.join()
+    messages = [record.getMessage() for record in caplog.records]
+    for entry in entries:
+        # Each log line is prefixed by the lookup and the entry processed by that worker thread
+        assert any(
+            "logging_eval" in message and f"{entry.id}:" in message and message.endswith(f"querying {entry.id}")
+            for message in messages
+        )
+    assert all("logging_eval_" not in message for message in messages)
+
+
+def test_thread_resets_entry_name() -> None:
+    entries = [BibtexEntry("test", "entry")]
+    thread = LookupThread(cast(LookupType, LoggingEval), entries, [{"title"}], Condition())
+    thread.run()
+    assert THREAD_INFO.entry_name is None
+
+
+class BlockingEval(AbstractLookup[BibtexEntry, BibtexEntry]):
+    """Lookup whose queries after the first block until released"""
+
+    name = "blocking_eval"
+    batch_size = 6
+    fields = {"title"}
+    thread: LookupThread
+    release = Event()
+    started: List[str] = []
+
+    def __init__(self, entry: BibtexEntry) -> None:
+        self.entry = entry
+        super().__init__(entry)
+
+    @classmethod
+    def query_batch(cls, entries: List[BibtexEntry]) -> Dict[int, LookupResult]:
+        return dict()
+
+    def query(self) -> Optional[BibtexEntry]:
+        self.started.append(self.entry.id)
+        if self.entry.id == "0":
+            self.thread.skip_to_end = True
+        else:
+            self.release.wait(5)
+        return None
+
+
+def test_thread_skip_cancels_queries() -> None:
+    entries = [BibtexEntry("test", str(i)) for i in range(6)]
+    to_complete: List[Set[FieldType]] = [{"title"} for _ in entries]
+    thread = LookupThread(cast(LookupType, BlockingEval), entries, to_complete, Condition(), workers=2)
+    BlockingEval.thread = thread
+    thread.start()
+    # Returns while a worker is still blocked on a query
+    thread.join(2)
+    assert not thread.is_alive()
+    BlockingEval.release.set()
+    # Queued queries were cancelled, only the ones already picked by a worker ran
+    assert len(BlockingEval.started) <= 3
+
+
+class FakeResponse:
+    status = 200
+    reason = "OK"
+    will_close = False
+    headers: Dict[str, str] = {}
+
+    def getheader(self, name: str) -> Optional[str]:
+        return None
+
+    def read(self) -> bytes:
+        return b"data"
+
+
+class FakeConnection:
+    created: List["FakeConnection"] = []
+    # Raised by successive requests, on any connection (None for a success)
+    failures: List[Optional[Exception]] = []
+
+    def __init__(self, domain: str, **kwargs: Any) -> None:
+        self.closed = False
+        self.created.append(self)
+
+    def request(self, *args: Any) -> None:
+        if self.failures:
+            failure = self.failures.pop(0)
+            if failure is not None:
+                raise failure
+
+    def getresponse(self) -> FakeResponse:
+        return FakeResponse()
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def fake_connections(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setattr(https, "HTTPSConnection", FakeConnection)
+    FakeConnection.created = []
+    FakeConnection.failures = []
+    https.close_connections()
+    yield
+    https.close_connections()
+
+
+class PooledLookup(https.HTTPSLookup[None, None]):
+    reuse_connections = True
+
+
+def test_close_connections(fake_connections: None) -> None:
+    lookup = PooledLookup(None)
+    lookup.send_request("example.com", "GET", "/", {})
+    lookup.send_request("example.com", "GET", "/", {})  # Reuses the connection
+    connections = list(https.CONNECTION_POOL.connections.values())
+    assert len(connections) == 1
+    https.close_connections()
+    assert cast(FakeConnection, connections[0]).closed
+    assert not https.CONNECTION_POOL.connections
+    assert not https.OPEN_CONNECTIONS
+
+
+def test_reconnects_stale_connection(fake_connections: None) -> None:
+    lookup = PooledLookup(None)
+    data = lookup.get_data()
+    assert data is not None and data.code == 200
+    # The server closed the kept-alive connection in the meantime
+    FakeConnection.failures = [RemoteDisconnected("Remote end closed connection without response")]
+    data = lookup.get_data()
+    assert data is not None and data.code == 200 and data.data == b"data"
+    first, second = FakeConnection.created  # Reconnected only once
+    assert first.closed and not second.closed
+    connections = list(https.CONNECTION_POOL.connections.values())
+    assert len(connections) == 1 and cast(FakeConnection, connections[0]) is second
+
+
+def test_drops_connection_on_timeout(fake_connections: None) -> None:
+    lookup = PooledLookup(None)
+    FakeConnection.failures = [timeout()]
+    assert lookup.get_data() is None
+    assert len(FakeConnection.created) == 1 and FakeConnection.created[0].closed
+    assert not https.CONNECTION_POOL.connections
+
+
+def test_no_retry_on_stale_post(fake_connections: None) -> None:
+    lookup = PooledLookup(None)
+    lookup.send_request("example.com", "POST", "/", {})
+    FakeConnection.failures = [RemoteDisconnected("Remote end closed connection without response")]
+    # The request may have been processed, don't send it again
+    with pytest.raises(RemoteDisconnected):
+        lookup.send_request("example.com", "POST", "/", {})
+    assert len(FakeConnection.created) == 1 and FakeConnection.created[0].closed
+    assert not https.CONNECTION_POOL.connections
+
+
+def test_unpooled_connections(fake_connections: None) -> None:
+    lookup = https.HTTPSLookup[None, None](None)
+    for _ in range(2):
+        data = lookup.get_data()
+        assert data is not None and data.code == 200
+    # A new connection per request, closed once read
+    assert len(FakeConnection.created) == 2
+    assert all(connection.closed for connection in FakeConnection.created)
+    assert not https.CONNECTION_POOL.connections
+    assert not https.OPEN_CONNECTIONS
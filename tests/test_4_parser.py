@@ -3,6 +3,7 @@ from typing import List
 
 import pytest
 
+from bibtexautocomplete.core.apis import LOOKUPS, REGISTRY
 from bibtexautocomplete.core.parser import filter_bibs, indent_string, make_output_name
 
 test = [
@@ -52,3 +53,25 @@ def test_filter(input: List[str], res: List[str]) -> None:
     path_in = [Path(x) for x in input]
     path_out = [Path(x) for x in res]
     assert filter_bibs(path_in) == path_out
+
+
+def test_lookup_names() -> None:
+    for name, path in LOOKUPS.items():
+        lookup = REGISTRY.get(name)
+        assert lookup.name == name
+        assert path.endswith(":" + lookup.__name__)
+
+
+def test_registry_override() -> None:
+    lookup = REGISTRY.get("crossref")
+    names = REGISTRY.names
+    with REGISTRY.override([lookup]):
+        assert REGISTRY.names == ("crossref",)
+        assert REGISTRY.lookups == (lookup,)
+        with pytest.raises(KeyError):
+            REGISTRY.get("unknown")
+        with pytest.raises(KeyError):
+            REGISTRY.get("zbmath")
+    assert REGISTRY.names == names
+    assert REGISTRY.get("zbmath").name == "zbmath"
+    assert REGISTRY.get("crossref") is lookup
@@ -1,13 +1,13 @@
 from datetime import datetime
 from os import path
-from typing import Iterable, List, Optional, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 import pytest
 
 from bibtexautocomplete.bibtex.base_field import BibtexField
 from bibtexautocomplete.bibtex.constants import FieldNames, FieldNamesSet
 from bibtexautocomplete.bibtex.entry import BibtexEntry
-from bibtexautocomplete.core.apis import LOOKUPS
+from bibtexautocomplete.core.apis import REGISTRY
 from bibtexautocomplete.core.main import main
 from bibtexautocomplete.lookups.abstract_base import AbstractDataLookup, Data
 from bibtexautocomplete.lookups.search_mixin import EntryMatchSearchMixin
@@ -98,8 +98,11 @@ class FakeLookup(EntryMatchSearchMixin[SafeJSON], AbstractDataLookup[BibtexEntry
         return entry
 
 
-LOOKUPS.clear()
-LOOKUPS.append(FakeLookup)
+@pytest.fixture(autouse=True)
+def fake_lookup() -> Iterator[None]:
+    """Only query FakeLookup in these tests"""
+    with REGISTRY.override([FakeLookup]):
+        yield
 
 
 FIELDS = FakeLookup.fields
@@ -0,0 +1,210 @@
+from pathlib import Path
+from time import time
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from bibtexautocomplete.lookups import https
+from bibtexautocomplete.lookups.cache import (
+    CachedResponse,
+    ResponseCache,
+    cache_key,
+    default_cache_path,
+    error_expiry,
+    response_expiry,
+)
+from bibtexautocomplete.lookups.https import HTTPSLookup
+from bibtexautocomplete.utils.constants import CACHE_TTL, RATE_LIMITED_TTL, SERVER_ERROR_TTL
+
+
+def open_cache(path: Path) -> ResponseCache:
+    cache = ResponseCache.open(path)
+    assert cache is not None
+    return cache
+
+
+def test_default_cache_path(tmp_path: Path) -> None:
+    assert default_cache_path() == tmp_path / "cache" / "bibtexautocomplete" / "responses.sqlite"
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, 100 + CACHE_TTL),
+        ("public", 100 + CACHE_TTL),
+        ("public, max-age=60", 160),
+        ('max-age="30"', 130),
+        ("max-age=abc", 100 + CACHE_TTL),
+        ("no-cache", 100),
+        ("max-age=60, no-store", None),
+    ],
+)
+def test_response_expiry(header: Optional[str], expected: Optional[float]) -> None:
+    assert response_expiry(header, 100.0) == expected
+
+
+@pytest.mark.parametrize(
+    ("code", "header", "expected"),
+    [
+        (200, None, None),
+        (404, "10", None),
+        (429, None, 100 + RATE_LIMITED_TTL),
+        (503, None, 100 + SERVER_ERROR_TTL),
+        (429, " 120", 220),
+        (500, "soon", 100 + SERVER_ERROR_TTL),
+        (429, "Thu, 01 Jan 1970 00:10:00 GMT", 600),
+        (429, "Thu, 01 Jan 1970 00:00:10 GMT", 100),
+    ],
+)
+def test_error_expiry(code: int, header: Optional[str], expected: Optional[float]) -> None:
+    assert error_expiry(code, header, 100.0) == expected
+
+
+def test_cache_roundtrip(tmp_path: Path) -> None:
+    path = tmp_path / "sub" / "cache.sqlite"
+    key = cache_key("GET", "https://example.org/a")
+    assert key != cache_key("GET", "https://example.org/b")
+    cache = open_cache(path)
+    assert cache.get(key) is None
+    response = CachedResponse(b"data", 200, "OK", time() + 10, '"tag"')
+    cache.set(key, response)
+    cache.close()
+    # Data persists across runs
+    cache = open_cache(path)
+    assert cache.get(key) == response
+    cache.set(key, response._replace(data=b"new"))
+    assert cache.get(key) == response._replace(data=b"new")
+    cache.close()
+
+
+def test_cache_drops_old_responses(tmp_path: Path) -> None:
+    path = tmp_path / "cache.sqlite"
+    cache = open_cache(path)
+    cache.set("old", CachedResponse(b"", 200, "OK", time() - 2 * CACHE_TTL, None))
+    cache.set("stale", CachedResponse(b"", 200, "OK", time() - 10, None))
+    cache.close()
+    cache = open_cache(path)
+    assert cache.get("old") is None
+    assert cache.get("stale") is not None
+    cache.close()
+
+
+class CachedLookup(HTTPSLookup[str, bytes]):
+    domain = "example.invalid"
+    path = "/search"
+    cache_responses = True
+
+    def __init__(self, input: str) -> None:
+        self.params = {"q": input}
+
+
+def test_lookup_uses_cache(tmp_path: Path) -> None:
+    cache = open_cache(tmp_path / "cache.sqlite")
+    lookup = CachedLookup("term")
+    cache.set(
+        cache_key("GET", "https://example.invalid/search?q=term"),
+        CachedResponse(b"cached", 200, "OK", time() + 60, None),
+    )
+    HTTPSLookup.response_cache = cache
+    data = lookup.get_data()
+    assert data is not None and data.data == b"cached" and data.code == 200
+    assert lookup.get_last_query_info()["cached"] is True
+    cache.close()
+
+
+def test_lookup_uses_cached_errors(tmp_path: Path) -> None:
+    cache = open_cache(tmp_path / "cache.sqlite")
+    lookup = CachedLookup("limited")
+    cache.set(
+        cache_key("GET", "https://example.invalid/search?q=limited"),
+        CachedResponse(b"", 429, "Too Many Requests", time() + 60, None),
+    )
+    HTTPSLookup.response_cache = cache
+    # No query is made (the domain doesn't resolve)
+    data = lookup.get_data()
+    assert data is not None and data.code == 429
+    cache.close()
+
+
+class FakeResponse:
+    will_close = True
+
+    def __init__(self, status: int, reason: str, headers: Dict[str, str], data: bytes = b"") -> None:
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.data = data
+
+    def getheader(self, name: str) -> Optional[str]:
+        return self.headers.get(name)
+
+    def read(self) -> bytes:
+        return self.data
+
+
+class FakeConnection:
+    """Answers all requests with response, recording their headers"""
+
+    response = FakeResponse(429, "Too Many Requests", {"Retry-After": "30"})
+    sent: List[Dict[str, str]] = []
+
+    def __init__(self, domain: str, **kwargs: Any) -> None:
+        pass
+
+    def request(self, request: str, path: str, body: Any, headers: Dict[str, str]) -> None:
+        self.sent.append(headers)
+
+    def getresponse(self) -> FakeResponse:
+        return self.response
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def fake_connection(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(https, "HTTPSConnection", FakeConnection)
+    monkeypatch.setattr(FakeConnection, "sent", [])
+
+
+def test_lookup_caches_errors(tmp_path: Path, fake_connection: None) -> None:
+    cache = open_cache(tmp_path / "cache.sqlite")
+    HTTPSLookup.response_cache = cache
+    start = time()
+    data = CachedLookup("limited").get_data()
+    assert data is not None and data.code == 429
+    cached = cache.get(cache_key("GET", "https://example.invalid/search?q=limited"))
+    assert cached is not None and cached.code == 429
+    assert start + 30 <= cached.expires <= time() + 30
+    cache.close()
+
+
+def test_refresh_keeps_valid_response(tmp_path: Path, fake_connection: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(HTTPSLookup, "refresh_cache", True)
+    cache = open_cache(tmp_path / "cache.sqlite")
+    HTTPSLookup.response_cache = cache
+    key = cache_key("GET", "https://example.invalid/search?q=valid")
+    response = CachedResponse(b"cached", 200, "OK", time() + 60, None)
+    cache.set(key, response)
+    # Queried again, but the rate limited response isn't stored
+    data = CachedLookup("valid").get_data()
+    assert data is not None and data.code == 429
+    assert len(FakeConnection.sent) == 1
+    assert cache.get(key) == response
+    cache.close()
+
+
+def test_lookup_revalidates(tmp_path: Path, fake_connection: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(FakeConnection, "response", FakeResponse(304, "Not Modified", {"Cache-Control": "max-age=60"}))
+    cache = open_cache(tmp_path / "cache.sqlite")
+    HTTPSLookup.response_cache = cache
+    key = cache_key("GET", "https://example.invalid/search?q=stale")
+    cache.set(key, CachedResponse(b"cached", 200, "OK", time() - 10, '"tag"'))
+    start = time()
+    data = CachedLookup("stale").get_data()
+    assert data is not None and data.data == b"cached" and data.code == 200
+    assert FakeConnection.sent[0]["If-None-Match"] == '"tag"'
+    cached = cache.get(key)
+    assert cached is not None and cached.data == b"cached" and cached.etag == '"tag"'
+    assert start + 60 <= cached.expires <= time() + 60
+    cache.close()
@@ -0,0 +1,84 @@
+import json
+from typing import Any, Dict, List
+
+import pytest
+
+from bibtexautocomplete.APIs.crossref import CrossrefLookup
+from bibtexautocomplete.bibtex.entry import BibtexEntry
+from bibtexautocomplete.lookups.abstract_base import Data
+from bibtexautocomplete.lookups.etiquette import Etiquette
+from bibtexautocomplete.utils.constants import EMAIL, NAME, VERSION_STR
+
+
+def make_entry(id: str, **fields: str) -> BibtexEntry:
+    return BibtexEntry.from_entry("test", {"ID": id, **fields})
+
+
+def work(doi: str, title: str) -> Dict[str, Any]:
+    return {"DOI": doi, "title": [title], "type": "journal-article", "author": [{"family": "Doe"}]}
+
+
+class _FakeCrossrefLookup(CrossrefLookup):
+    """Crossref lookup answering batch queries with canned works"""
+
+    works: List[Dict[str, Any]] = []
+    queries: List[Dict[str, str]] = []
+
+    def get_data(self) -> Data:
+        self.queries.append(self.get_params())
+        payload = {"status": "ok", "message": {"items": self.works}}
+        return Data(data=json.dumps(payload).encode(), code=200, reason="OK", delay=0.0)
+
+
+def test_batch_params() -> None:
+    lookup = CrossrefLookup(make_entry("a"))
+    lookup.batch_dois = ["10.1109/tro.2004.829459", "10.1007/3-540-46425-5_21"]
+    assert lookup.get_params() == {
+        "rows": "2",
+        "filter": "doi:10.1109/tro.2004.829459,doi:10.1007/3-540-46425-5_21",
+        "mailto": EMAIL,
+    }
+
+
+def test_etiquette(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(CrossrefLookup, "etiquette", Etiquette(email="someone@example.org", url="https://example.org"))
+    lookup = CrossrefLookup(make_entry("a", title="Some title"))
+    assert lookup.get_params()["mailto"] == "someone@example.org"
+    user_agent = f"{NAME}/{VERSION_STR} (https://example.org; mailto:someone@example.org)"
+    assert lookup.get_headers()["User-Agent"] == user_agent
+
+
+def test_query_batch_dispatches_by_doi() -> None:
+    _FakeCrossrefLookup.queries = []
+    _FakeCrossrefLookup.works = [
+        work("10.1007/3-540-46425-5_21", "Second title"),
+        work("10.1109/TRO.2004.829459", "First title"),
+        work("10.1109/tro.2004.829459", "First title (duplicate record)"),
+    ]
+    entries = [
+        make_entry("first", doi="10.1109/tro.2004.829459", title="First title"),
+        make_entry("nodoi", title="Other title"),
+        make_entry("second", doi="10.1007/3-540-46425-5_21", title="Second title"),
+        make_entry("missing", doi="10.1145/1234567.890", title="Missing"),
+    ]
+    found = _FakeCrossrefLookup.query_batch(entries)
+    assert len(_FakeCrossrefLookup.queries) == 1
+    assert (
+        _FakeCrossrefLookup.queries[0]["filter"]
+        == "doi:10.1109/tro.2004.829459,doi:10.1007/3-540-46425-5_21,doi:10.1145/1234567.890"
+    )
+    assert sorted(found) == [0, 2]
+    first, second = found[0].entry, found[2].entry
+    assert first is not None and first.id == "first"
+    assert first.title.to_str() == "First title"
+    assert second is not None and second.title.to_str() == "Second title"
+    # Number of works found for each DOI
+    assert found[0].info["hit-count"] == 2
+    assert found[2].info["hit-count"] == 1
+
+
+def test_query_batch_single_doi() -> None:
+    _FakeCrossrefLookup.queries = []
+    entries = [make_entry("first", doi="10.1109/tro.2004.829459"), make_entry("nodoi", title="Title")]
+    assert _FakeCrossrefLookup.query_batch(entries) == {}
+    assert _FakeCrossrefLookup.queries == []
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Iterator, List
+from typing import Iterator
 
 import pytest
 
 from bibtexautocomplete.bibtex.constants import FieldNamesSet, SearchedFields
 from bibtexautocomplete.bibtex.entry import BibtexEntry
-from bibtexautocomplete.core import apis, parser
+from bibtexautocomplete.core.apis import REGISTRY
 from bibtexautocomplete.core.main import ErrorCodes, main
 from bibtexautocomplete.lookups.abstract_entry_lookup import AbstractEntryLookup
 
@@ -42,22 +42,8 @@ class FakeCrossrefLookup(AbstractEntryLookup):
 def fake_lookups() -> Iterator[None]:
     """Temporarily replace configured lookups with deterministic fakes."""
 
-    original_lookups: List[type[AbstractEntryLookup]] = list(apis.LOOKUPS)
-    original_lookup_names = list(apis.LOOKUP_NAMES)
-
-    fake_lookups_list: List[type[AbstractEntryLookup]] = [FakeZbMathLookup, FakeCrossrefLookup]
-    new_lookup_names = [cls.name for cls in fake_lookups_list]
-
-    apis.LOOKUPS[:] = fake_lookups_list
-    apis.LOOKUP_NAMES[:] = new_lookup_names
-    parser.LOOKUP_NAMES[:] = new_lookup_names
-
-    try:
+    with REGISTRY.override([FakeZbMathLookup, FakeCrossrefLookup]):
         yield
-    finally:
-        apis.LOOKUPS[:] = original_lookups
-        apis.LOOKUP_NAMES[:] = original_lookup_names
-        parser.LOOKUP_NAMES[:] = original_lookup_names
 
 
 def test_replace_entry_prefers_first_lookup(tmp_path: Path, fake_lookups: None) -> None:
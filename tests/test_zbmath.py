@@ -363,3 +363,86 @@ def test_zbmath_retries_without_latex() -> None:
     assert lookup.searches[2].startswith('"On Rings"')
     assert "\\" not in lookup.searches[2]
 
+    assert lookup.get_last_query_info()["zbmath-result-count"] == 1
+    assert lookup._get_query_title() == r"On \textbfRings"
+
+
+class _EmptyZbMathLookup(ZbMathLookup):
+    """Lookup which never finds anything, recording its searches"""
+
+    searches: List[str] = []
+
+    def get_data(self) -> Data:
+        self.searches.append(self.get_params()["search_string"])
+        self._last_query_info = {"response-status": 200}
+        return Data(data=b'{"result": []}', code=200, reason="OK", delay=0.0)
+
+
+def test_zbmath_skips_known_bad_doi() -> None:
+    ZbMathLookup._bad_doi_cache.clear()
+    _EmptyZbMathLookup.searches = []
+    for id in ("first", "second"):
+        entry = BibtexEntry.from_entry("test", {"ID": id, "doi": "10.1234/missing", "title": "Rings"})
+        assert _EmptyZbMathLookup(entry).query() is None
+    assert _EmptyZbMathLookup.searches == ["doi:10.1234/missing", '"Rings"', '"Rings"']
+    ZbMathLookup._bad_doi_cache.clear()
+
+
+def _document(title: str, doi: Optional[str]) -> Dict[str, object]:
+    return {
+        "contributors": {"authors": [{"name": "Doe, J."}]},
+        "document_type": {"code": "j"},
+        "doi": doi,
+        "links": [],
+        "source": {"book": [], "pages": None, "series": []},
+        "title": {"title": title},
+        "zbmath_url": "https://zbmath.org/?q=example",
+        "year": "2023",
+    }
+
+
+class _BatchZbMathLookup(ZbMathLookup):
+    """Lookup answering batched searches with canned documents"""
+
+    documents: List[Dict[str, object]] = []
+    searches: List[str] = []
+
+    def get_data(self) -> Data:
+        self.searches.append(self.get_params()["search_string"])
+        self._last_query_info = {"response-status": 200}
+        return Data(data=json.dumps({"result": self.documents}).encode(), code=200, reason="OK", delay=0.0)
+
+
+def test_zbmath_query_batch() -> None:
+    ZbMathLookup._bad_doi_cache.clear()
+    _BatchZbMathLookup.searches = []
+    _BatchZbMathLookup.documents = [
+        _document("On Groups", None),
+        _document("On Rings", "10.1234/rings"),
+        _document("On Groups", "10.1234/groups"),
+    ]
+    entries = [
+        BibtexEntry.from_entry("test", {"ID": "rings", "doi": "10.1234/rings", "title": "On Rings"}),
+        BibtexEntry.from_entry("test", {"ID": "groups", "title": "On Groups", "author": "Doe, J."}),
+        BibtexEntry.from_entry("test", {"ID": "missing", "doi": "10.1234/missing", "title": "On Fields"}),
+        BibtexEntry.from_entry("test", {"ID": "notitle"}),
+    ]
+    found = _BatchZbMathLookup.query_batch(entries)
+    assert _BatchZbMathLookup.searches == ['doi:10.1234/rings | ("On Groups" Doe, J*) | doi:10.1234/missing']
+    assert sorted(found) == [0, 1]
+    rings, groups = found[0].entry, found[1].entry
+    assert rings is not None and rings.title.to_str() == "On Rings"
+    assert groups is not None and groups.title.to_str() == "On Groups"
+    assert groups.doi.to_str() is None
+    # Hits are counted per entry, not for the whole batched query
+    assert found[0].info["hit-count"] == found[0].info["zbmath-result-count"] == 1
+    assert found[1].info["hit-count"] == found[1].info["zbmath-result-count"] == 2
+    assert ZbMathLookup._bad_doi_cache == {"10.1234/missing"}
+    ZbMathLookup._bad_doi_cache.clear()
+
+
+def test_zbmath_query_batch_single_search() -> None:
+    _BatchZbMathLookup.searches = []
+    entries = [BibtexEntry.from_entry("test", {"ID": "rings", "title": "On Rings"}), BibtexEntry("test", "empty")]
+    assert _BatchZbMathLookup.query_batch(entries) == {}
+    assert _BatchZbMathLookup.searches == []